@@ -0,0 +1,224 @@
+"""
+Offline bulk generation
+
+Generates websites for a list of prompts in-process, without the HTTP server
+or MongoDB, and writes each one as index.html, styles.css and script.js:
+
+    python -m app.cli prompts.txt --output-dir sites --concurrency 8
+    cat prompts.txt | python -m app.cli - --output-dir sites
+
+The input has one prompt per line; blank lines and lines starting with # are
+skipped. A line starting with { is read as a JSON object with the fields of
+POST /api/generate, e.g. {"prompt": "...", "color_scheme": "dark"}.
+
+Each site goes to its own directory, named after the prompt and a hash of
+the request, together with a site.json summary. A directory only appears
+once all its files are written, so an interrupted run can simply be started
+again: sites that already exist are skipped unless --force is given.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+from pydantic import ValidationError
+
+from .env import load_environment
+from .models.schemas import WebsiteRequest
+from .services.ai_service import AIService
+from .services.batch import run_deduplicated
+from .services.shared_state import get_shared_state
+from .services.structured_logging import configure_logging, shutdown_logging
+from .services.tracing import get_exporter
+
+
+def read_requests(
+    stream: TextIO,
+    style: str = "modern",
+    color_scheme: str = "default",
+    mode: str = "ai",
+    deadline_ms: Optional[int] = None,
+    page_weight: bool = False
+) -> List[WebsiteRequest]:
+    """Parse prompt lines, applying the command-line defaults to plain prompts"""
+    requests = []
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = {
+            "style": style, "color_scheme": color_scheme, "mode": mode,
+            "deadline_ms": deadline_ms, "page_weight": page_weight
+        }
+        try:
+            if line.startswith("{"):
+                fields.update(json.loads(line))
+            else:
+                fields["prompt"] = line
+            requests.append(WebsiteRequest(**fields))
+        except (ValueError, ValidationError) as e:
+            raise SystemExit(f"Line {line_number}: {e}")
+    return requests
+
+
+def request_key(request: WebsiteRequest) -> str:
+    return json.dumps(request.dict(), sort_keys=True)
+
+
+def site_dirname(request: WebsiteRequest) -> str:
+    """Stable directory name, so reruns find the sites already written"""
+    slug = re.sub(r"[^a-z0-9]+", "-", request.prompt.lower()).strip("-")[:40].rstrip("-") or "site"
+    digest = hashlib.sha1(request_key(request).encode("utf-8")).hexdigest()[:10]
+    return f"{slug}-{digest}"
+
+
+def _write_files(directory: Path, html: str, css: str, js: str) -> None:
+    directory.mkdir(parents=True)
+    (directory / "index.html").write_text(html, encoding="utf-8")
+    (directory / "styles.css").write_text(css, encoding="utf-8")
+    (directory / "script.js").write_text(js or "", encoding="utf-8")
+
+
+def write_site(output_dir: Path, name: str, request: WebsiteRequest, result: Dict, elapsed_s: float) -> None:
+    """Write a site to a temporary directory and move it into place when complete"""
+    staging = output_dir / f".{name}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    _write_files(staging, result["html"], result["css"], result["js"])
+    for number, variant in enumerate(result.get("variants", []), 2):
+        _write_files(staging / f"variant-{number}", variant["html"], variant["css"], result["js"])
+    summary = {
+        "request": request.dict(),
+        "title": result.get("title"),
+        "meta_description": result.get("meta_description"),
+        "degraded": result.get("degraded", []),
+        "usage": result.get("usage"),
+        "page_weight": result.get("page_weight"),
+        "elapsed_s": round(elapsed_s, 3)
+    }
+    (staging / "site.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    target = output_dir / name
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    if str(args.prompts) == "-":
+        requests = read_requests(sys.stdin, args.style, args.color_scheme, args.mode, args.deadline_ms, args.page_weight)
+    else:
+        with open(args.prompts, encoding="utf-8") as f:
+            requests = read_requests(f, args.style, args.color_scheme, args.mode, args.deadline_ms, args.page_weight)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    names = {request_key(request): site_dirname(request) for request in requests}
+    todo = [
+        request for request in requests
+        if args.force or not (args.output_dir / names[request_key(request)]).is_dir()
+    ]
+    skipped = len(requests) - len(todo)
+    if skipped:
+        print(f"Skipping {skipped} sites already in {args.output_dir}", file=sys.stderr)
+
+    ai_service = AIService()
+    totals = {"input_tokens": 0, "output_tokens": 0}
+
+    async def generate_one(request: WebsiteRequest) -> Dict:
+        start = time.perf_counter()
+        result = await ai_service.generate_website(
+            prompt=request.prompt,
+            style=request.style,
+            color_scheme=request.color_scheme,
+            deadline_ms=request.deadline_ms,
+            mode=request.mode,
+            variants=request.variants,
+            variant_color_schemes=request.variant_color_schemes,
+            page_weight=request.page_weight
+        )
+        elapsed = time.perf_counter() - start
+        await asyncio.to_thread(write_site, args.output_dir, names[request_key(request)], request, result, elapsed)
+        return {"result": result, "elapsed_s": elapsed}
+
+    done = failed = 0
+    start = time.perf_counter()
+    async for indices, outcome, error in run_deduplicated(todo, request_key, generate_one, args.concurrency):
+        request = todo[indices[0]]
+        done += len(indices)
+        name = names[request_key(request)]
+        if error is not None:
+            failed += len(indices)
+            print(f"[{done}/{len(todo)}] failed {name}: {error}", file=sys.stderr)
+            continue
+        usage = outcome["result"].get("usage") or {}
+        totals["input_tokens"] += usage.get("input_tokens", 0)
+        totals["output_tokens"] += usage.get("output_tokens", 0)
+        print(f"[{done}/{len(todo)}] {name} ({outcome['elapsed_s']:.1f}s)", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    generated = len(todo) - failed
+    return {
+        "requested": len(requests),
+        "generated": generated,
+        "skipped": skipped,
+        "failed": failed,
+        "elapsed_s": round(elapsed, 3),
+        "sites_per_s": round(generated / elapsed, 3) if elapsed > 0 else 0.0,
+        **totals
+    }
+
+
+def print_summary(summary: Dict) -> None:
+    print(f"{summary['generated']} sites generated, {summary['skipped']} skipped, {summary['failed']} failed "
+          f"in {summary['elapsed_s']:.1f}s ({summary['sites_per_s']:.2f} sites/s)")
+    print(f"Model tokens: {summary['input_tokens']} in, {summary['output_tokens']} out")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("prompts", help="File with one prompt per line, or - to read stdin")
+    parser.add_argument("--output-dir", type=Path, default=Path("sites"))
+    parser.add_argument("--concurrency", type=int, default=4, help="Sites generated at the same time")
+    parser.add_argument("--style", default="modern")
+    parser.add_argument("--color-scheme", default="default")
+    parser.add_argument("--mode", choices=("ai", "instant"), default="ai")
+    parser.add_argument("--deadline-ms", type=int, help="Latency budget per site")
+    parser.add_argument("--page-weight", action="store_true", help="Add a page weight report to site.json")
+    parser.add_argument("--force", action="store_true", help="Regenerate sites that already exist")
+    parser.add_argument("--summary", type=Path, help="Write the run summary as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    load_environment()
+    # Fallback warnings would interleave with the progress lines
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    configure_logging()
+    try:
+        summary = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("Interrupted; run again to resume", file=sys.stderr)
+        return 130
+    finally:
+        get_shared_state().close()
+        get_exporter().shutdown()
+        shutdown_logging()
+    print_summary(summary)
+    if args.summary:
+        args.summary.write_text(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
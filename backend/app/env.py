@@ -0,0 +1,22 @@
+"""
+Loading of backend/.env
+
+Entry points (the API in main.py, the CLI) call load_environment() once at
+startup, before anything reads its settings from the environment.
+"""
+from pathlib import Path
+
+ENV_PATH = Path(__file__).parent.parent / ".env"
+
+_loaded = False
+
+
+def load_environment() -> None:
+    """Read backend/.env into os.environ once; variables that are already set win"""
+    global _loaded
+    if _loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=ENV_PATH)
+    _loaded = True
@@ -1,13 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+import logging
 import os
-from dotenv import load_dotenv
 
-from .routes import generate, projects
+from .env import load_environment
+from .routes import generate, projects, jobs, preview
 from .models.database import Database
+from .services.metrics import REGISTRY
+from .services.tracing import get_exporter
+from .services.shared_state import get_shared_state
+from .services.structured_logging import configure_logging, shutdown_logging
+from .middleware import MetricsMiddleware, TracingMiddleware
 
-load_dotenv()
+load_environment()
+configure_logging()
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -16,18 +26,24 @@ async def lifespan(app: FastAPI):
     Startup and shutdown events
     """
     # Startup
-    print("Starting up AI Website Generator API...")
+    logger.info("Starting up AI Website Generator API...")
+    await jobs.start_worker_pool()
     yield
     # Shutdown
-    print("Shutting down...")
+    logger.info("Shutting down...")
+    await jobs.stop_worker_pool()
     await Database.close_connection()
+    get_shared_state().close()
+    get_exporter().shutdown()
+    shutdown_logging()
 
 
 app = FastAPI(
     title="AI Website Generator API",
     description="Generate websites using AI based on natural language prompts",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -40,10 +56,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware, timing_allow_origins=origins)
 
 # Include routers
 app.include_router(generate.router, prefix="/api", tags=["Generate"])
+app.include_router(jobs.router, prefix="/api", tags=["Generate"])
 app.include_router(projects.router, prefix="/api", tags=["Projects"])
+# Outside /api so pages resolve their relative asset URLs under /preview/{id}/
+app.include_router(preview.router, tags=["Preview"])
 
 
 @app.get("/")
@@ -56,9 +77,12 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "generate": "/api/generate",
+            "generate_jobs": "/api/generate/jobs",
             "projects": "/api/projects",
+            "preview": "/preview/{project_id}/index.html",
             "color_schemes": "/api/color-schemes",
-            "styles": "/api/styles"
+            "styles": "/api/styles",
+            "metrics": "/metrics"
         }
     }
 
@@ -69,3 +93,11 @@ async def health_check():
     Health check endpoint
     """
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics endpoint
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
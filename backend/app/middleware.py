@@ -0,0 +1,99 @@
+"""
+ASGI middleware for request instrumentation
+"""
+import time
+import uuid
+from typing import Sequence
+
+from .services.metrics import histogram
+from .services.structured_logging import request_id_var
+from .services.tracing import KIND_SERVER, parse_traceparent, span
+
+REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+
+
+class MetricsMiddleware:
+    """Records request latency per route; plain ASGI to keep per-request overhead low"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status[0]
+            )
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of every request and reports it in a Server-Timing header
+
+    An incoming W3C traceparent header is continued. timing_allow_origins lets
+    the frontend read the header from JavaScript as well as in devtools. The
+    request ID used in logs is taken from X-Request-ID or generated, and
+    echoed back in the response.
+    """
+
+    def __init__(self, app, timing_allow_origins: Sequence[str] = ()):
+        self.app = app
+        self.timing_allow_origin = ", ".join(timing_allow_origins).encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        method = scope["method"]
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:128] or uuid.uuid4().hex
+        request_id_token = request_id_var.set(request_id)
+
+        with span(f"{method} {scope['path']}", timing="app", kind=KIND_SERVER, parent=parent,
+                  **{"http.method": method, "http.target": scope["path"]}) as root:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    route = scope.get("route")
+                    if route is not None:
+                        root.name = f"{method} {route.path}"
+                        root.set_attribute("http.route", route.path)
+                    # The app span is still open here, so report its time so far
+                    root.end()
+                    response_headers = list(message.get("headers", []))
+                    response_headers.append((b"server-timing", root.trace.server_timing().encode("latin-1")))
+                    response_headers.append((b"x-request-id", request_id.encode("latin-1")))
+                    if self.timing_allow_origin:
+                        response_headers.append((b"timing-allow-origin", self.timing_allow_origin))
+                    message = {**message, "headers": response_headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                request_id_var.reset(request_id_token)
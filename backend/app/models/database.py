@@ -1,36 +1,187 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+import asyncio
 import os
-from dotenv import load_dotenv
+import time
+
+from ..services.metrics import counter, histogram
+
+if TYPE_CHECKING:
+    from bson import ObjectId
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+# motor, pymongo and bson are imported on first use rather than at startup,
+# so routes that never touch the database do not pay for loading them
+
+MONGO_CLIENTS = counter(
+    "mongo_clients_created_total",
+    "MongoDB clients created, by database mode; more than one per process means connections were rebuilt",
+    ("mode",)
+)
+MONGO_HANDSHAKE = histogram(
+    "mongo_connection_handshake_seconds",
+    "Time to open, handshake and authenticate a pooled MongoDB connection"
+)
+
+# Client settings in serverless mode, where each container serves one request
+# at a time and may be frozen between invocations
+_SERVERLESS_DEFAULTS = {
+    "maxPoolSize": 2,
+    "minPoolSize": 0,
+    # Fail fast instead of holding the invocation for pymongo's default 30s
+    "serverSelectionTimeoutMS": 3000,
+    "connectTimeoutMS": 3000,
+    # Drop sockets that sat idle while the container was frozen
+    "maxIdleTimeMS": 60000
+}
+
+# Environment variable -> client option, applied in every mode
+_ENV_OPTIONS = {
+    "MONGODB_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGODB_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGODB_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGODB_MAX_IDLE_TIME_MS": "maxIdleTimeMS"
+}
+
+
+def database_mode() -> str:
+    """Database mode from DATABASE_MODE, defaulting to serverless on Vercel"""
+    mode = os.getenv("DATABASE_MODE") or ("serverless" if os.getenv("VERCEL") else "server")
+    if mode not in ("server", "serverless"):
+        raise ValueError(f"Invalid database mode: {mode}")
+    return mode
+
+
+def client_options(mode: str) -> Dict:
+    options = dict(_SERVERLESS_DEFAULTS) if mode == "serverless" else {}
+    for variable, option in _ENV_OPTIONS.items():
+        value = os.getenv(variable)
+        if value:
+            options[option] = int(value)
+    return options
+
+
+def _handshake_listener():
+    """Pool listener recording how long each new connection takes to become usable"""
+    from pymongo import monitoring
+
+    class HandshakeListener(monitoring.ConnectionPoolListener):
+        def __init__(self):
+            self._started: Dict[Tuple, float] = {}
+
+        def connection_created(self, event):
+            self._started[(event.address, event.connection_id)] = time.perf_counter()
+
+        def connection_ready(self, event):
+            started = self._started.pop((event.address, event.connection_id), None)
+            if started is not None:
+                MONGO_HANDSHAKE.observe(time.perf_counter() - started)
+
+        def connection_closed(self, event):
+            self._started.pop((event.address, event.connection_id), None)
+
+        def pool_created(self, event):
+            pass
+
+        def pool_ready(self, event):
+            pass
+
+        def pool_cleared(self, event):
+            pass
+
+        def pool_closed(self, event):
+            pass
+
+        def connection_check_out_started(self, event):
+            pass
+
+        def connection_check_out_failed(self, event):
+            pass
+
+        def connection_checked_out(self, event):
+            pass
+
+        def connection_checked_in(self, event):
+            pass
+
+    return HandshakeListener()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
 
-load_dotenv()
 
 class Database:
-    client: Optional[AsyncIOMotorClient] = None
-    
+    client: Optional["AsyncIOMotorClient"] = None
+    # Event loop the client was created on; motor clients cannot move between loops
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
     @classmethod
-    def get_client(cls) -> AsyncIOMotorClient:
-        """Get MongoDB client instance"""
+    def get_client(cls) -> "AsyncIOMotorClient":
+        """
+        Get MongoDB client instance
+
+        The client connects lazily on its first operation and is kept for the
+        life of the process, so warm serverless invocations reuse its
+        connections. It is only rebuilt when the event loop it was created
+        on has been closed.
+        """
+        loop = _running_loop()
+        if cls.client is not None and cls._loop is not None and cls._loop is not loop and cls._loop.is_closed():
+            cls.client.close()
+            cls.client = None
         if cls.client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            mode = database_mode()
             mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-            cls.client = AsyncIOMotorClient(mongodb_url)
+            cls.client = AsyncIOMotorClient(
+                mongodb_url,
+                event_listeners=[_handshake_listener()],
+                **client_options(mode)
+            )
+            cls._loop = loop
+            MONGO_CLIENTS.inc(mode=mode)
         return cls.client
-    
+
     @classmethod
     def get_database(cls):
         """Get database instance"""
         client = cls.get_client()
         db_name = os.getenv("DATABASE_NAME", "website_generator")
         return client[db_name]
-    
+
     @classmethod
-    async def close_connection(cls):
-        """Close MongoDB connection"""
-        if cls.client:
+    async def close_connection(cls, force: bool = False):
+        """
+        Close MongoDB connection
+
+        In serverless mode the client outlives application shutdown so the
+        next invocation in the same container skips the handshake; pass
+        force=True to close it anyway.
+        """
+        if cls.client and (force or database_mode() != "serverless"):
             cls.client.close()
             cls.client = None
+            cls._loop = None
 
 
 async def get_database():
     """Dependency for FastAPI routes"""
     return Database.get_database()
+
+
+def is_object_id(value: str) -> bool:
+    """Whether value is a valid MongoDB document ID"""
+    from bson import ObjectId
+
+    return ObjectId.is_valid(value)
+
+
+def object_id(value: str) -> "ObjectId":
+    """Convert a document ID string to an ObjectId"""
+    from bson import ObjectId
+
+    return ObjectId(value)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Literal
 from datetime import datetime
 
 
@@ -8,6 +8,30 @@ class WebsiteRequest(BaseModel):
     prompt: str = Field(..., description="User's description of the website")
     style: Optional[str] = Field(default="modern", description="Design style preference")
     color_scheme: Optional[str] = Field(default="default", description="Color scheme preference")
+    deadline_ms: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Latency budget in milliseconds; parts not ready in time use heuristic content"
+    )
+    mode: Literal["ai", "instant"] = Field(
+        default="ai",
+        description="'instant' builds the site from prompt heuristics without calling the model"
+    )
+    variants: int = Field(
+        default=1,
+        ge=1,
+        le=4,
+        description="Number of versions to generate; analysis and meta are shared (ignored in instant mode)"
+    )
+    variant_color_schemes: Optional[List[str]] = Field(
+        default=None,
+        min_length=1,
+        description="Color schemes cycled through the variants, starting with the second"
+    )
+    page_weight: bool = Field(
+        default=False,
+        description="Include a page weight report for the page and each variant"
+    )
 
 
 class ComponentData(BaseModel):
@@ -18,6 +42,76 @@ class ComponentData(BaseModel):
     js: Optional[str] = None
 
 
+class TokenUsage(BaseModel):
+    """Model tokens used by one or more calls"""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    calls: int = 0
+    estimated: bool = Field(
+        default=False,
+        description="True when some counts were estimated locally because the provider reported none"
+    )
+
+
+class GenerationUsage(TokenUsage):
+    """Token usage of a generation, in total and per stage"""
+    stages: Dict[str, TokenUsage] = {}
+
+
+class AssetSize(BaseModel):
+    raw: int
+    gzip: int
+
+
+class PageBytes(BaseModel):
+    html: AssetSize
+    css: AssetSize
+    js: AssetSize
+    total: AssetSize
+
+
+class DomStats(BaseModel):
+    nodes: int
+    max_depth: int
+
+
+class StylesheetStats(BaseModel):
+    rules: int
+    selectors: int
+    unused_selector_count: int
+    unused_selectors: List[str] = Field(
+        default=[],
+        description="Selectors naming a class, id or element the page does not contain (first 50)"
+    )
+
+
+class BudgetViolation(BaseModel):
+    metric: str
+    value: int
+    limit: int
+
+
+class PageWeightReport(BaseModel):
+    """Download size and DOM and stylesheet complexity of a page, checked against budgets"""
+    bytes: PageBytes
+    dom: DomStats
+    css: StylesheetStats
+    external_requests: int = Field(..., description="Resources the page fetches besides the document itself")
+    within_budget: bool
+    over_budget: List[BudgetViolation] = []
+
+
+class WebsiteVariant(BaseModel):
+    """An alternative version of a generated website"""
+    html: str
+    css: str
+    components: List[ComponentData]
+    style: str
+    color_scheme: str
+    degraded: List[str] = []
+    page_weight: Optional[PageWeightReport] = None
+
+
 class WebsiteResponse(BaseModel):
     """Response model for generated website"""
     id: Optional[str] = None
@@ -30,6 +124,51 @@ class WebsiteResponse(BaseModel):
     prompt: str
     style: str
     color_scheme: str
+    degraded: List[str] = []
+    usage: Optional[GenerationUsage] = None
+    page_weight: Optional[PageWeightReport] = None
+    variants: List[WebsiteVariant] = []
+
+
+class BatchRequest(BaseModel):
+    """Request model for generating several websites in one call"""
+    requests: List[WebsiteRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Websites generated at the same time; capped by GENERATE_BATCH_CONCURRENCY"
+    )
+
+
+class GenerationJob(BaseModel):
+    """Status of an asynchronous generation job"""
+    id: str
+    status: str
+    partial_components: List[ComponentData] = []
+    result: Optional[WebsiteResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class ComponentRegenerateRequest(BaseModel):
+    """Request model for regenerating one component of a project"""
+    prompt: Optional[str] = Field(
+        default=None,
+        description="Prompt to use instead of the project's original prompt"
+    )
+
+
+class RethemeRequest(BaseModel):
+    """Request model for switching the color scheme of a stylesheet"""
+    color_scheme: Optional[str] = Field(
+        default=None,
+        description="Target color scheme; omit to get the stylesheet in every scheme"
+    )
+    css: Optional[str] = Field(
+        default=None,
+        description="Stylesheet of a generation result (only for /api/retheme)"
+    )
 
 
 class ProjectModel(BaseModel):
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
-from ..models.schemas import WebsiteRequest, WebsiteResponse
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from ..models.schemas import WebsiteRequest, WebsiteResponse, RethemeRequest, BatchRequest
 from ..services.ai_service import AIService
-from typing import Dict
+from ..services.admission import AdmissionController, AdmissionRejected
+from ..services.batch import run_deduplicated
+from ..services.theming import ThemeError, check_color_schemes, retheme_all, retheme_css
+from typing import AsyncIterator, Dict
+import os
+import orjson
 
 router = APIRouter()
 _ai_service: AIService | None = None
+_admission: AdmissionController | None = None
 
 def get_ai_service() -> AIService:
     """Lazy-load AIService to ensure .env is loaded first"""
@@ -14,21 +21,73 @@ def get_ai_service() -> AIService:
     return _ai_service
 
 
+def get_admission_controller() -> AdmissionController:
+    """Lazy-load the admission controller so limits are read from .env"""
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController.from_env()
+    return _admission
+
+
+def get_client_key(raw_request: Request) -> str:
+    """Identify the caller for per-client rate limits"""
+    client_key = raw_request.headers.get("X-Client-Key")
+    if client_key:
+        return client_key
+    return raw_request.client.host if raw_request.client else "anonymous"
+
+
+def website_content(result: Dict) -> Dict:
+    """
+    Complete a generation result to the WebsiteResponse shape without re-validating it
+
+    AIService builds its results in that shape, so validating them again only
+    adds the defaults below while copying every HTML and CSS string.
+    """
+    result.setdefault("id", None)
+    result.setdefault("variants", [])
+    return result
+
+
 @router.post("/generate", response_model=WebsiteResponse)
-async def generate_website(request: WebsiteRequest) -> Dict:
+async def generate_website(request: WebsiteRequest, raw_request: Request) -> ORJSONResponse:
     """
     Generate a website based on user prompt
     """
     try:
+        check_color_schemes([request.color_scheme, *(request.variant_color_schemes or [])])
         ai_service = get_ai_service()
-        result = await ai_service.generate_website(
-            prompt=request.prompt,
-            style=request.style,
-            color_scheme=request.color_scheme
-        )
+        if request.mode == "instant":
+            # No model calls, so nothing for admission control to protect
+            return ORJSONResponse(website_content(ai_service.generate_instant(
+                prompt=request.prompt,
+                style=request.style,
+                color_scheme=request.color_scheme,
+                page_weight=request.page_weight
+            )))
+        
+        admission = get_admission_controller()
+        async with admission.slot(get_client_key(raw_request)):
+            result = await ai_service.generate_website(
+                prompt=request.prompt,
+                style=request.style,
+                color_scheme=request.color_scheme,
+                deadline_ms=request.deadline_ms,
+                variants=request.variants,
+                variant_color_schemes=request.variant_color_schemes,
+                page_weight=request.page_weight
+            )
         
-        return result
+        return ORJSONResponse(website_content(result))
     
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except ThemeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -36,6 +95,94 @@ async def generate_website(request: WebsiteRequest) -> Dict:
         )
 
 
+@router.post("/generate/batch")
+async def generate_batch(request: BatchRequest, raw_request: Request):
+    """
+    Generate several websites, streaming one NDJSON line per request as each finishes
+    """
+    max_items = int(os.getenv("GENERATE_BATCH_MAX_ITEMS", "100"))
+    if len(request.requests) > max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(request.requests)} requests; the limit is {max_items}"
+        )
+
+    admission = get_admission_controller()
+    try:
+        # The whole batch counts as one request against the client's rate limit
+        await admission.check_rate(get_client_key(raw_request))
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    max_concurrency = int(os.getenv("GENERATE_BATCH_CONCURRENCY", "4"))
+    concurrency = min(request.concurrency or max_concurrency, max_concurrency)
+    ai_service = get_ai_service()
+
+    async def generate_one(item: WebsiteRequest) -> Dict:
+        check_color_schemes([item.color_scheme, *(item.variant_color_schemes or [])])
+        if item.mode == "instant":
+            return ai_service.generate_instant(
+                prompt=item.prompt,
+                style=item.style,
+                color_scheme=item.color_scheme,
+                page_weight=item.page_weight
+            )
+        # Items still share the server-wide generation slots with /generate
+        async with admission.slot():
+            return await ai_service.generate_website(
+                prompt=item.prompt,
+                style=item.style,
+                color_scheme=item.color_scheme,
+                deadline_ms=item.deadline_ms,
+                variants=item.variants,
+                variant_color_schemes=item.variant_color_schemes,
+                page_weight=item.page_weight
+            )
+
+    async def lines() -> AsyncIterator[bytes]:
+        results = run_deduplicated(
+            request.requests,
+            key=lambda item: orjson.dumps(item.dict(), option=orjson.OPT_SORT_KEYS),
+            worker=generate_one,
+            concurrency=concurrency
+        )
+        async for indices, result, error in results:
+            if error is None:
+                payload = {"status": "ok", "result": website_content(result)}
+            elif isinstance(error, AdmissionRejected):
+                payload = {"status": "error", "status_code": error.status_code, "error": error.detail}
+            elif isinstance(error, ThemeError):
+                payload = {"status": "error", "status_code": 400, "error": str(error)}
+            else:
+                payload = {"status": "error", "status_code": 500, "error": f"Error generating website: {str(error)}"}
+            for index in indices:
+                yield orjson.dumps({"index": index, **payload}) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/retheme")
+async def retheme(request: RethemeRequest):
+    """
+    Switch a generated stylesheet to another color scheme, or to all of them
+    """
+    if request.css is None:
+        raise HTTPException(status_code=400, detail="css is required")
+    try:
+        if request.color_scheme is None:
+            return ORJSONResponse({"themes": retheme_all(request.css)})
+        return {
+            "color_scheme": request.color_scheme,
+            "css": retheme_css(request.css, request.color_scheme)
+        }
+    except ThemeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/color-schemes")
 async def get_color_schemes():
     """
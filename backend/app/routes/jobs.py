@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from ..models.schemas import WebsiteRequest, GenerationJob
+from ..models.database import Database, get_database, is_object_id
+from ..services.jobs import JobStore, JobWorkerPool, TERMINAL_STATUSES, external_workers, pool_from_env
+from ..services.theming import ThemeError, check_color_schemes
+from .generate import get_ai_service
+import asyncio
+
+router = APIRouter()
+_worker_pool: JobWorkerPool | None = None
+
+# How often a long-poll re-reads the job
+_LONG_POLL_INTERVAL_S = 0.25
+
+
+async def start_worker_pool():
+    """Start the local generation workers configured by GENERATION_WORKERS"""
+    global _worker_pool
+    _worker_pool = pool_from_env(Database.get_database, get_ai_service)
+    if _worker_pool is not None:
+        _worker_pool.start()
+
+
+async def stop_worker_pool():
+    """Stop local workers; their running jobs are re-claimed once the lease expires"""
+    global _worker_pool
+    if _worker_pool is not None:
+        await _worker_pool.stop()
+        _worker_pool = None
+
+
+def _job_state(job: dict) -> tuple:
+    return job["status"], len(job.get("partial_components", []))
+
+
+@router.post("/generate/jobs", response_model=dict, status_code=202)
+async def create_generation_job(request: WebsiteRequest, db=Depends(get_database)):
+    """
+    Queue a website generation and return its job ID
+
+    Returns 503 when nothing would run the job: this process has no workers
+    and GENERATION_EXTERNAL_WORKERS does not say that app.worker processes do.
+    """
+    try:
+        if _worker_pool is None and not external_workers():
+            raise HTTPException(
+                status_code=503,
+                detail="No generation workers are running; set GENERATION_WORKERS or run python -m app.worker "
+                       "with GENERATION_EXTERNAL_WORKERS=1"
+            )
+        check_color_schemes([request.color_scheme, *(request.variant_color_schemes or [])])
+        job_id = await JobStore(db).create(request.dict())
+        if _worker_pool is not None:
+            _worker_pool.notify()
+        
+        return {"id": job_id, "status": "queued"}
+    
+    except HTTPException:
+        raise
+    except ThemeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error queueing generation job: {str(e)}"
+        )
+
+
+@router.get("/generate/jobs/{job_id}", response_model=GenerationJob)
+async def get_generation_job(
+    job_id: str,
+    wait: float = Query(default=0, ge=0, le=30, description="Long-poll up to this many seconds for a change"),
+    db=Depends(get_database)
+):
+    """
+    Get the status, partial components and result of a generation job
+    """
+    try:
+        if not is_object_id(job_id):
+            raise HTTPException(status_code=400, detail="Invalid job ID")
+        
+        store = JobStore(db)
+        job = await store.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        initial_state = _job_state(job)
+        while job["status"] not in TERMINAL_STATUSES and loop.time() < deadline:
+            await asyncio.sleep(min(_LONG_POLL_INTERVAL_S, max(deadline - loop.time(), 0)))
+            job = await store.get(job_id) or job
+            if _job_state(job) != initial_state:
+                break
+        
+        return job
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching generation job: {str(e)}"
+        )
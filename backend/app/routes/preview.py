@@ -0,0 +1,127 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import Response
+from typing import Dict, Optional, Tuple
+import hashlib
+import re
+from ..models.database import get_database, is_object_id, object_id
+from .projects import _mongo_op
+
+router = APIRouter()
+
+# Hashed asset URLs change whenever their content does, so they can be cached
+# for as long as caches allow; the HTML that points at them is always revalidated
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Generated pages run in a unique origin, so their scripts cannot reach the
+# API's origin, and the declared content types are not second-guessed
+SECURITY_HEADERS = {
+    "Content-Security-Policy": "sandbox allow-scripts",
+    "X-Content-Type-Options": "nosniff"
+}
+
+# Served file name -> (project field, content type); Response adds the
+# charset to text/* types itself
+ASSETS: Dict[str, Tuple[str, str]] = {
+    "styles.css": ("css", "text/css"),
+    "script.js": ("js", "application/javascript; charset=utf-8")
+}
+
+_HASHED_ASSET = re.compile(r"^(styles|script)\.([0-9a-f]{16})\.(css|js)$")
+# The references _assemble_html writes into every page
+_ASSET_REFERENCE = re.compile(r'(\b(?:href|src)=["\'])(styles\.css|script\.js)(["\'])')
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+def hashed_name(name: str, content: str) -> str:
+    """styles.css -> styles.<hash>.css"""
+    stem, extension = name.rsplit(".", 1)
+    return f"{stem}.{content_hash(content)}.{extension}"
+
+
+def rewrite_asset_urls(html: str, css: str, js: str) -> str:
+    """Point a page's stylesheet and script references at their hashed URLs"""
+    names = {"styles.css": hashed_name("styles.css", css), "script.js": hashed_name("script.js", js)}
+    return _ASSET_REFERENCE.sub(lambda m: f"{m.group(1)}{names[m.group(2)]}{m.group(3)}", html)
+
+
+def _parse_asset(asset: str) -> Tuple[str, Optional[str]]:
+    """Split a requested file name into its unhashed name and hash, if any"""
+    if asset in ASSETS:
+        return asset, None
+    match = _HASHED_ASSET.match(asset)
+    if match and f"{match.group(1)}.{match.group(3)}" in ASSETS:
+        return f"{match.group(1)}.{match.group(3)}", match.group(2)
+    raise HTTPException(status_code=404, detail="Preview file not found")
+
+
+def _file_response(request: Request, body: str, media_type: str, cache_control: str) -> Response:
+    etag = f'"{content_hash(body)}"'
+    headers = {"Cache-Control": cache_control, "ETag": etag, **SECURITY_HEADERS}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+
+async def _find_project(db, project_id: str, fields: Tuple[str, ...]) -> Dict:
+    if not is_object_id(project_id):
+        raise HTTPException(status_code=400, detail="Invalid project ID")
+
+    with _mongo_op("find_one"):
+        project = await db.projects.find_one({"_id": object_id(project_id)}, {field: 1 for field in fields})
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+
+@router.get("/preview/{project_id}/index.html")
+async def preview_page(project_id: str, request: Request, db=Depends(get_database)):
+    """
+    Serve a saved project as a page, linking its stylesheet and script by content hash
+    """
+    try:
+        project = await _find_project(db, project_id, ("html", "css", "js"))
+        html = rewrite_asset_urls(project["html"], project.get("css", ""), project.get("js", ""))
+        return _file_response(request, html, "text/html", REVALIDATE)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error serving preview: {str(e)}"
+        )
+
+
+@router.get("/preview/{project_id}/{asset}")
+async def preview_asset(project_id: str, asset: str, request: Request, db=Depends(get_database)):
+    """
+    Serve a saved project's stylesheet or script
+
+    Hashed names (styles.<hash>.css, script.<hash>.js) are cached as immutable
+    and return 404 once the project's file has changed; the plain names always
+    serve the current file and are revalidated.
+    """
+    try:
+        name, requested_hash = _parse_asset(asset)
+        field, media_type = ASSETS[name]
+        project = await _find_project(db, project_id, (field,))
+        content = project.get(field, "")
+
+        if requested_hash is None:
+            return _file_response(request, content, media_type, REVALIDATE)
+        if content_hash(content) != requested_hash:
+            raise HTTPException(status_code=404, detail="Preview file has changed")
+        return _file_response(request, content, media_type, IMMUTABLE)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error serving preview: {str(e)}"
+        )
@@ -1,12 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from ..models.schemas import ProjectModel, WebsiteResponse
-from ..models.database import get_database
-from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse
+from typing import Iterator, List, Optional
+from contextlib import contextmanager
+from ..models.schemas import ProjectModel, WebsiteResponse, ComponentRegenerateRequest, RethemeRequest, PageWeightReport
+from ..models.database import get_database, is_object_id, object_id
+from ..services.admission import AdmissionRejected
+from .generate import get_ai_service, get_admission_controller, get_client_key
+from ..services.metrics import histogram
+from ..services.page_weight import analyze_page
+from ..services.tracing import span
+from ..services.theming import ThemeError, retheme_all, retheme_css
 from datetime import datetime
 
 router = APIRouter()
 
+MONGO_SECONDS = histogram(
+    "mongo_operation_seconds",
+    "Latency of MongoDB operations issued by the projects routes",
+    ("operation",)
+)
+
+
+@contextmanager
+def _mongo_op(operation: str) -> Iterator[None]:
+    """Time a projects collection call as a metric and a trace span"""
+    with MONGO_SECONDS.time(operation=operation), \
+            span(f"mongo.{operation}", timing="mongo", **{"db.collection": "projects"}):
+        yield
+
 
 @router.post("/projects", response_model=dict)
 async def save_project(project: ProjectModel, db=Depends(get_database)):
@@ -18,7 +39,8 @@ async def save_project(project: ProjectModel, db=Depends(get_database)):
         project_dict["created_at"] = datetime.utcnow()
         project_dict["updated_at"] = datetime.utcnow()
         
-        result = await db.projects.insert_one(project_dict)
+        with _mongo_op("insert_one"):
+            result = await db.projects.insert_one(project_dict)
         
         return {
             "id": str(result.inserted_id),
@@ -39,14 +61,17 @@ async def get_projects(db=Depends(get_database)):
     """
     try:
         projects = []
-        cursor = db.projects.find().sort("created_at", -1)
+        with _mongo_op("find"):
+            cursor = db.projects.find().sort("created_at", -1)
+            
+            async for project in cursor:
+                project["id"] = str(project["_id"])
+                del project["_id"]
+                projects.append(project)
         
-        async for project in cursor:
-            project["id"] = str(project["_id"])
-            del project["_id"]
-            projects.append(project)
-        
-        return {"projects": projects}
+        # Stored documents are plain JSON types and datetimes, which orjson
+        # writes directly without a jsonable_encoder pass over every string
+        return ORJSONResponse({"projects": projects})
     
     except Exception as e:
         raise HTTPException(
@@ -61,10 +86,11 @@ async def get_project(project_id: str, db=Depends(get_database)):
     Get a specific project by ID
     """
     try:
-        if not ObjectId.is_valid(project_id):
+        if not is_object_id(project_id):
             raise HTTPException(status_code=400, detail="Invalid project ID")
         
-        project = await db.projects.find_one({"_id": ObjectId(project_id)})
+        with _mongo_op("find_one"):
+            project = await db.projects.find_one({"_id": object_id(project_id)})
         
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -72,7 +98,7 @@ async def get_project(project_id: str, db=Depends(get_database)):
         project["id"] = str(project["_id"])
         del project["_id"]
         
-        return project
+        return ORJSONResponse(project)
     
     except HTTPException:
         raise
@@ -83,6 +109,32 @@ async def get_project(project_id: str, db=Depends(get_database)):
         )
 
 
+@router.get("/projects/{project_id}/page-weight", response_model=PageWeightReport)
+async def get_project_page_weight(project_id: str, db=Depends(get_database)):
+    """
+    Report a saved project's page weight against the configured budgets
+    """
+    try:
+        if not is_object_id(project_id):
+            raise HTTPException(status_code=400, detail="Invalid project ID")
+        
+        with _mongo_op("find_one"):
+            project = await db.projects.find_one({"_id": object_id(project_id)}, {"html": 1, "css": 1, "js": 1})
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        return ORJSONResponse(analyze_page(project.get("html", ""), project.get("css", ""), project.get("js", "")))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error analyzing project: {str(e)}"
+        )
+
+
 @router.put("/projects/{project_id}")
 async def update_project(
     project_id: str,
@@ -93,16 +145,17 @@ async def update_project(
     Update an existing project
     """
     try:
-        if not ObjectId.is_valid(project_id):
+        if not is_object_id(project_id):
             raise HTTPException(status_code=400, detail="Invalid project ID")
         
         project_dict = project.dict(exclude={"id", "created_at"})
         project_dict["updated_at"] = datetime.utcnow()
         
-        result = await db.projects.update_one(
-            {"_id": ObjectId(project_id)},
-            {"$set": project_dict}
-        )
+        with _mongo_op("update_one"):
+            result = await db.projects.update_one(
+                {"_id": object_id(project_id)},
+                {"$set": project_dict}
+            )
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -124,10 +177,11 @@ async def delete_project(project_id: str, db=Depends(get_database)):
     Delete a project
     """
     try:
-        if not ObjectId.is_valid(project_id):
+        if not is_object_id(project_id):
             raise HTTPException(status_code=400, detail="Invalid project ID")
         
-        result = await db.projects.delete_one({"_id": ObjectId(project_id)})
+        with _mongo_op("delete_one"):
+            result = await db.projects.delete_one({"_id": object_id(project_id)})
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -141,3 +195,135 @@ async def delete_project(project_id: str, db=Depends(get_database)):
             status_code=500,
             detail=f"Error deleting project: {str(e)}"
         )
+
+
+@router.post("/projects/{project_id}/components/{component_type}/regenerate")
+async def regenerate_component(
+    project_id: str,
+    component_type: str,
+    raw_request: Request,
+    request: Optional[ComponentRegenerateRequest] = None,
+    db=Depends(get_database)
+):
+    """
+    Regenerate a single component of a saved project
+
+    Makes one model call and writes only the changed component and HTML back.
+    """
+    try:
+        if not is_object_id(project_id):
+            raise HTTPException(status_code=400, detail="Invalid project ID")
+        
+        with _mongo_op("find_one"):
+            project = await db.projects.find_one(
+                {"_id": object_id(project_id)},
+                {"prompt": 1, "style": 1, "color_scheme": 1, "components": 1, "html": 1, "title": 1, "meta_description": 1}
+            )
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        types = [component.get("type") for component in project.get("components", [])]
+        if component_type not in types:
+            raise HTTPException(status_code=404, detail=f"Project has no {component_type} component")
+        index = types.index(component_type)
+        
+        admission = get_admission_controller()
+        async with admission.slot(get_client_key(raw_request)):
+            result = await get_ai_service().regenerate_component(
+                project,
+                index,
+                prompt=request.prompt if request else None
+            )
+        
+        updated_at = datetime.utcnow()
+        with _mongo_op("update_one"):
+            # Matching on the HTML that was read guards against overwriting a
+            # concurrent edit, since the whole page is written back
+            update = await db.projects.update_one(
+                {
+                    "_id": object_id(project_id),
+                    f"components.{index}.type": component_type,
+                    "html": project["html"]
+                },
+                {"$set": {
+                    f"components.{index}": result["component"],
+                    "html": result["html"],
+                    "updated_at": updated_at
+                }}
+            )
+        
+        if update.matched_count == 0:
+            raise HTTPException(status_code=409, detail="Project changed during regeneration, please retry")
+        
+        return {
+            "id": project_id,
+            "component": result["component"],
+            "html": result["html"],
+            "usage": result["usage"],
+            "updated_at": updated_at
+        }
+    
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error regenerating component: {str(e)}"
+        )
+
+
+@router.post("/projects/{project_id}/retheme")
+async def retheme_project(project_id: str, request: RethemeRequest, db=Depends(get_database)):
+    """
+    Switch a project to another color scheme without regenerating it
+
+    With a color_scheme the project is updated; without one, the stylesheet
+    is returned in every scheme for previewing and nothing is saved.
+    """
+    try:
+        if not is_object_id(project_id):
+            raise HTTPException(status_code=400, detail="Invalid project ID")
+        
+        with _mongo_op("find_one"):
+            project = await db.projects.find_one({"_id": object_id(project_id)}, {"css": 1})
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        if request.color_scheme is None:
+            return ORJSONResponse({"id": project_id, "themes": retheme_all(project["css"])})
+        
+        css = retheme_css(project["css"], request.color_scheme)
+        updated_at = datetime.utcnow()
+        with _mongo_op("update_one"):
+            update = await db.projects.update_one(
+                {"_id": object_id(project_id), "css": project["css"]},
+                {"$set": {"css": css, "color_scheme": request.color_scheme, "updated_at": updated_at}}
+            )
+        
+        if update.matched_count == 0:
+            raise HTTPException(status_code=409, detail="Project changed during re-theming, please retry")
+        
+        return {
+            "id": project_id,
+            "color_scheme": request.color_scheme,
+            "css": css,
+            "updated_at": updated_at
+        }
+    
+    except ThemeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error re-theming project: {str(e)}"
+        )
@@ -0,0 +1,115 @@
+"""
+Admission control for website generation: concurrency limit, bounded wait
+queue and optional per-client token buckets
+"""
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from .metrics import counter, gauge, histogram
+from .shared_state import MemoryState, SharedState, get_shared_state
+
+QUEUE_DEPTH = gauge("generate_queue_depth", "Generation requests waiting for a slot")
+IN_FLIGHT = gauge("generate_in_flight", "Generation requests currently running")
+QUEUE_WAIT = histogram("generate_queue_wait_seconds", "Time spent waiting for a generation slot")
+REJECTED = counter(
+    "generate_admission_rejected_total",
+    "Generation requests rejected by admission control",
+    ("reason",)
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; maps to an HTTP error"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 32,
+        queue_timeout: float = 30.0,
+        rate_per_client: float = 0.0,
+        burst_per_client: float = 5.0,
+        state: Optional[SharedState] = None
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate_per_client = rate_per_client
+        self.burst_per_client = burst_per_client
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        # Client buckets live in the shared state so a client's rate holds across workers
+        self.state = state or MemoryState()
+        # Moving average of generation time, used to estimate Retry-After
+        self._avg_service_s = 5.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.getenv("GENERATE_MAX_CONCURRENCY", "8")),
+            max_queue=int(os.getenv("GENERATE_MAX_QUEUE", "32")),
+            queue_timeout=float(os.getenv("GENERATE_QUEUE_TIMEOUT_S", "30")),
+            rate_per_client=float(os.getenv("GENERATE_RATE_PER_CLIENT", "0")),
+            burst_per_client=float(os.getenv("GENERATE_RATE_BURST", "5")),
+            state=get_shared_state()
+        )
+
+    async def check_rate(self, client_key: Optional[str]) -> None:
+        """Take one token from the client's bucket or raise AdmissionRejected"""
+        if self.rate_per_client <= 0 or not client_key:
+            return
+        wait = await self.state.take_token(f"rate:{client_key}", self.rate_per_client, self.burst_per_client)
+        if wait > 0:
+            REJECTED.inc(reason="rate_limited")
+            raise AdmissionRejected(429, "Rate limit exceeded", max(1, math.ceil(wait)))
+
+    def _estimate_retry_after(self) -> int:
+        return max(1, math.ceil(self._avg_service_s * (self._waiting + 1) / self.max_concurrent))
+
+    @asynccontextmanager
+    async def slot(self, client_key: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        Hold a generation slot for the duration of the block
+        """
+        await self.check_rate(client_key)
+
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                REJECTED.inc(reason="queue_full")
+                raise AdmissionRejected(429, "Generation queue is full", self._estimate_retry_after())
+
+            self._waiting += 1
+            QUEUE_DEPTH.set(self._waiting)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                REJECTED.inc(reason="queue_timeout")
+                raise AdmissionRejected(503, "Timed out waiting for a generation slot", self._estimate_retry_after())
+            finally:
+                self._waiting -= 1
+                QUEUE_DEPTH.set(self._waiting)
+                QUEUE_WAIT.observe(time.perf_counter() - start)
+        else:
+            await self._semaphore.acquire()
+            QUEUE_WAIT.observe(0.0)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._avg_service_s = 0.9 * self._avg_service_s + 0.1 * (time.perf_counter() - start)
+            IN_FLIGHT.dec()
+            self._semaphore.release()
@@ -1,53 +1,319 @@
-import google.generativeai as genai
-import os
+import asyncio
 import json
-from typing import Dict, List
-from dotenv import load_dotenv
-from pathlib import Path
-from ..templates.components import COMPONENTS, COMMON_JS
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from html import escape as escape_html
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from ..templates.components import COMPONENTS, COMPONENT_FIELDS, COMMON_JS
 from ..templates.color_schemes import COLOR_SCHEMES
-
-# Load .env from backend directory
-env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
+from .classifier import classify
+from .providers import ModelProvider, ModelResponse, estimate_tokens, provider_from_env
+from .cassette import wrap_with_cassette
+from .response_cache import wrap_with_cache
+from .model_config import ModelTiers
+from .page_weight import analyze_page, record_page_weight
+from .theming import check_color_schemes
+from .metrics import counter, histogram
+from .tracing import KIND_CLIENT, span
+from .structured_logging import truncate
+from ..templates.heuristic_content import (
+    NAV_ITEMS, CTA_BUTTONS, FEATURES, FEATURE_HEADINGS, GALLERY, GALLERY_COLORS,
+    CONTACT_SUBTITLES, FOOTER_SECTIONS, BRAND_STOPWORDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Time kept back from a latency budget for assembling the final document
+_ASSEMBLY_RESERVE_S = 0.02
+# Below this much remaining budget the meta call is skipped for heuristics
+_META_MIN_BUDGET_S = 0.25
+# Extra variants sample component content progressively hotter than the first
+_VARIANT_BASE_TEMPERATURE = 0.7
+_VARIANT_TEMPERATURE_STEP = 0.15
+
+_BRAND_PATTERN = re.compile(
+    r"""\b(?:called|named)\s+["']?([A-Z][\w&'-]*(?:\s+[A-Z][\w&'-]*)*)|"([^"]{2,40})\""""
+)
+_WORD_PATTERN = re.compile(r"[A-Za-z][\w&'-]*")
+_SLOT_PATTERN = re.compile(r"\{(\w+)\}")
+
+_TOKEN_BUCKETS = (25, 50, 100, 200, 400, 800, 1600, 3200, 6400, 12800)
+
+STAGE_SECONDS = histogram(
+    "generation_stage_seconds",
+    "Time spent in each website generation stage",
+    ("stage",)
+)
+COMPONENT_SECONDS = histogram(
+    "generation_component_seconds",
+    "Time to produce each component, model call included",
+    ("component",)
+)
+MODEL_CALLS = counter(
+    "model_calls_total",
+    "Model calls by stage and outcome (ok, json_fallback, exception)",
+    ("stage", "outcome")
+)
+PARTS = counter(
+    "generation_parts_total",
+    "Generated parts (analysis, meta, each component) by stage",
+    ("stage",)
+)
+FALLBACKS = counter(
+    "generation_fallbacks_total",
+    "Parts that fell back to heuristic or default content, by reason",
+    ("stage", "reason")
+)
+MODEL_TOKENS = counter(
+    "model_tokens_total",
+    "Model tokens by stage, direction (input, output) and source (usage, estimate)",
+    ("stage", "direction", "source")
+)
+PROMPT_TOKENS = histogram(
+    "model_prompt_tokens",
+    "Input tokens per model call",
+    ("stage",),
+    buckets=_TOKEN_BUCKETS
+)
+GENERATION_TOKENS = histogram(
+    "generation_tokens",
+    "Tokens used by one AI generation, by direction",
+    ("direction",),
+    buckets=_TOKEN_BUCKETS + (25600, 51200)
+)
+
+# Token usage of the generation running in the current task; the stage tasks
+# it starts inherit the same accumulator
+_usage_var: ContextVar[Optional[Dict]] = ContextVar("generation_usage", default=None)
+
+_HERO_IMAGE = '<div style="width: 100%; height: 400px; background: linear-gradient(135deg, var(--bg-secondary) 0%, var(--accent) 100%); border-radius: 12px; display: flex; align-items: center; justify-content: center;"><span style="font-size: 4rem; opacity: 0.5;">✨</span></div>'
+
+
+def _empty_usage() -> Dict:
+    return {"input_tokens": 0, "output_tokens": 0, "calls": 0, "estimated": False}
+
+
+@contextmanager
+def _tracked_usage() -> Iterator[Dict]:
+    """Collect the token usage of every model call made inside the block"""
+    usage = {**_empty_usage(), "stages": {}}
+    token = _usage_var.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage_var.reset(token)
+
+
+@lru_cache(maxsize=None)
+def _field_spec(component_type: str, style: str) -> str:
+    """Field list for one component prompt, in the order its template uses the slots"""
+    fields = COMPONENT_FIELDS.get(component_type, {})
+    slots = dict.fromkeys(_SLOT_PATTERN.findall(COMPONENTS[component_type][style]))
+    return "\n".join(f"- {slot}: {fields[slot]}" for slot in slots if slot in fields)
 
 
 class AIService:
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, provider: Optional[ModelProvider] = None, model_tiers: Optional[ModelTiers] = None):
+        self._provider = provider
+        self._model_tiers = model_tiers
+
+    @property
+    def provider(self) -> ModelProvider:
+        """Build the configured provider on first use so instant mode works without a key"""
+        if self._provider is None:
+            provider = wrap_with_cassette(provider_from_env) or provider_from_env()
+            self._provider = wrap_with_cache(provider, cacheable=self._parses)
+        return self._provider
+
+    @property
+    def model_tiers(self) -> ModelTiers:
+        """Per-stage model settings, read from the environment on first use"""
+        if self._model_tiers is None:
+            self._model_tiers = ModelTiers.from_env()
+        return self._model_tiers
     
     async def generate_website(
         self, 
         prompt: str, 
         style: str = "modern",
-        color_scheme: str = "default"
+        color_scheme: str = "default",
+        deadline_ms: Optional[int] = None,
+        on_component: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        mode: str = "ai",
+        variants: int = 1,
+        variant_color_schemes: Optional[List[str]] = None,
+        page_weight: bool = False
     ) -> Dict:
         """
         Generate a complete website based on user prompt
+
+        With a deadline_ms budget, stages still running when it runs out fall
+        back to heuristic content and are listed in the "degraded" field.
+        on_component is awaited with each component as soon as it is ready.
+        mode="instant" builds the site from heuristics without any model call.
+        Token counts per stage and in total are returned in the "usage" field.
+
+        With variants > 1, analysis and meta run once and the extra variants'
+        components are generated concurrently at higher temperatures, cycling
+        through variant_color_schemes. They are returned under "variants".
+        on_component only receives the first variant's components. Unknown
+        color schemes, for the page or its variants, raise ThemeError.
+
+        With page_weight, the page and each variant carry a page weight
+        report under "page_weight"; otherwise it is None.
         """
+        check_color_schemes([color_scheme, *(variant_color_schemes or [])])
+        if mode == "instant":
+            result = self.generate_instant(prompt, style, color_scheme, page_weight)
+            if on_component is not None:
+                for component in result["components"]:
+                    await on_component(component)
+            return result
+
+        # Fail fast when the model is not configured
+        self.provider
+        with _tracked_usage() as usage:
+            result = await self._generate_with_model(
+                prompt, style, color_scheme, deadline_ms, on_component, variants, variant_color_schemes, page_weight
+            )
+        GENERATION_TOKENS.observe(usage["input_tokens"], direction="input")
+        GENERATION_TOKENS.observe(usage["output_tokens"], direction="output")
+        result["usage"] = usage
+        return result
+
+    async def _generate_with_model(
+        self,
+        prompt: str,
+        style: str,
+        color_scheme: str,
+        deadline_ms: Optional[int],
+        on_component: Optional[Callable[[Dict], Awaitable[None]]],
+        variants: int = 1,
+        variant_color_schemes: Optional[List[str]] = None,
+        page_weight: bool = False
+    ) -> Dict:
+        """Analysis, components, meta and assembly for one model-backed generation"""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_ms / 1000 if deadline_ms else None
+        degraded: List[str] = []
+        variant_degraded: List[List[str]] = [[] for _ in range(variants - 1)]
+
+        def remaining() -> Optional[float]:
+            if deadline is None:
+                return None
+            return max(deadline - loop.time() - _ASSEMBLY_RESERVE_S, 0)
         
         # Analyze the prompt to determine components needed
-        components_analysis = await self._analyze_prompt(prompt)
+        try:
+            components_analysis = await asyncio.wait_for(
+                self._timed_stage("analysis", self._analyze_prompt(prompt)),
+                timeout=remaining()
+            )
+        except asyncio.TimeoutError:
+            components_analysis = self._heuristic_analyze(prompt)
+            degraded.append("analysis")
+            for other in variant_degraded:
+                other.append("analysis")
+            PARTS.inc(stage="analysis")
+            FALLBACKS.inc(stage="analysis", reason="deadline")
         
-        # Generate content for each component
-        components_data = await self._generate_components(
-            prompt, 
-            components_analysis,
-            style
-        )
+        # Generate meta information alongside the components, unless the
+        # budget is already too low to be worth a model call
+        budget = remaining()
+        meta_task = None
+        if budget is None or budget >= _META_MIN_BUDGET_S:
+            meta_task = asyncio.create_task(
+                self._timed_stage("meta", self._generate_meta_info(prompt))
+            )
         
-        # Generate meta information
-        meta_info = await self._generate_meta_info(prompt)
+        # Generate content for each component, for every variant at once
+        with STAGE_SECONDS.time(stage="components"), span("generate.components", timing="components"):
+            timeout = remaining()
+            results = await asyncio.gather(
+                self._generate_components(
+                    prompt, 
+                    components_analysis,
+                    style,
+                    timeout=timeout,
+                    degraded=degraded,
+                    on_component=on_component
+                ),
+                *(
+                    self._generate_components(
+                        prompt,
+                        components_analysis,
+                        style,
+                        timeout=timeout,
+                        degraded=variant_degraded[index],
+                        temperature=self._variant_temperature(index + 1)
+                    )
+                    for index in range(variants - 1)
+                ),
+                return_exceptions=True
+            )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            if meta_task is not None:
+                meta_task.cancel()
+                await asyncio.gather(meta_task, return_exceptions=True)
+            raise errors[0]
+        components_data, *variant_components = results
         
-        # Assemble the full website
-        html = self._assemble_html(components_data, meta_info, style, color_scheme)
-        css = self._assemble_css(components_data, color_scheme)
+        if meta_task is not None:
+            try:
+                meta_info = await asyncio.wait_for(meta_task, timeout=remaining())
+            except asyncio.TimeoutError:
+                meta_task = None
+        if meta_task is None:
+            meta_info = self._heuristic_meta(prompt)
+            degraded.append("meta")
+            for other in variant_degraded:
+                other.append("meta")
+            PARTS.inc(stage="meta")
+            FALLBACKS.inc(stage="meta", reason="deadline")
+        
+        # Assemble the full website. The stylesheet only depends on the scheme
+        # and the component types, so variants sharing both share one build.
+        css_cache: Dict = {}
+
+        def stylesheet(components: List[Dict], scheme: str) -> str:
+            key = (scheme, tuple(component["type"] for component in components))
+            if key not in css_cache:
+                with span("assemble_css"):
+                    css_cache[key] = self._assemble_css(components, scheme)
+            return css_cache[key]
+
+        with STAGE_SECONDS.time(stage="assembly"), span("generate.assembly", timing="assembly"):
+            with span("assemble_html"):
+                html = self._assemble_html(components_data, meta_info, style, color_scheme)
+            css = stylesheet(components_data, color_scheme)
+            other_variants = []
+            for index, components in enumerate(variant_components, start=1):
+                if variant_color_schemes:
+                    scheme = variant_color_schemes[(index - 1) % len(variant_color_schemes)]
+                else:
+                    scheme = color_scheme
+                with span("assemble_html"):
+                    variant_html = self._assemble_html(components, meta_info, style, scheme)
+                variant_css = stylesheet(components, scheme)
+                other_variants.append({
+                    "html": variant_html,
+                    "css": variant_css,
+                    "components": components,
+                    "style": style,
+                    "color_scheme": scheme,
+                    "degraded": variant_degraded[index - 1],
+                    "page_weight": self._page_weight(variant_html, variant_css, COMMON_JS) if page_weight else None
+                })
+            report = self._page_weight(html, css, COMMON_JS) if page_weight else None
         js = COMMON_JS
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="total")
         
         return {
             "html": html,
@@ -58,8 +324,196 @@ class AIService:
             "title": meta_info["title"],
             "prompt": prompt,
             "style": style,
-            "color_scheme": color_scheme
+            "color_scheme": color_scheme,
+            "degraded": degraded,
+            "page_weight": report,
+            "variants": other_variants
+        }
+
+    async def regenerate_component(
+        self,
+        project: Dict,
+        index: int,
+        prompt: Optional[str] = None
+    ) -> Dict:
+        """
+        Regenerate one component of a saved site with a single model call
+
+        Only that component's markup is replaced in the site HTML; the
+        stylesheet is unchanged because it depends on component types only.
+        Returns the new component, the updated HTML and the token usage.
+        """
+        prompt = prompt or project["prompt"]
+        style = project.get("style") or "modern"
+        components = list(project["components"])
+        old_component = components[index]
+        component_type = old_component["type"]
+
+        self.provider
+        with _tracked_usage() as usage, COMPONENT_SECONDS.time(component=component_type), \
+                span(f"component.{component_type}", timing=f"component.{component_type}"):
+            content = await self._generate_component_content(
+                prompt,
+                component_type,
+                self._infer_website_type(prompt),
+                style
+            )
+        component = self._component_data(component_type, content)
+        components[index] = component
+
+        html = project.get("html") or ""
+        old_html = old_component.get("html")
+        if old_html and html.count(old_html) == 1:
+            html = html.replace(old_html, component["html"])
+        else:
+            # The stored page no longer matches its components, so rebuild it
+            meta_info = {"title": project.get("title", ""), "description": project.get("meta_description", "")}
+            html = self._assemble_html(components, meta_info, style, project.get("color_scheme") or "default")
+        return {"component": component, "html": html, "usage": usage}
+
+    def generate_instant(
+        self,
+        prompt: str,
+        style: str = "modern",
+        color_scheme: str = "default",
+        page_weight: bool = False
+    ) -> Dict:
+        """
+        Build a complete website from prompt heuristics alone, with no model calls
+        """
+        with STAGE_SECONDS.time(stage="instant"), span("generate.instant", timing="instant"):
+            return self._build_instant(prompt, style, color_scheme, page_weight)
+
+    def _build_instant(self, prompt: str, style: str, color_scheme: str, page_weight: bool = False) -> Dict:
+        analysis = self._heuristic_analyze(prompt)
+        components_data = []
+        for component_type in analysis["components"]:
+            content_data = self._get_default_content(component_type, prompt)
+            html = self._fill_template(COMPONENTS[component_type][style], content_data, component_type)
+            components_data.append(self._component_data(component_type, {"html": html}))
+        meta_info = self._heuristic_meta(prompt)
+        html = self._assemble_html(components_data, meta_info, style, color_scheme)
+        css = self._assemble_css(components_data, color_scheme)
+        
+        return {
+            "html": html,
+            "css": css,
+            "js": COMMON_JS,
+            "components": components_data,
+            "meta_description": meta_info["description"],
+            "title": meta_info["title"],
+            "prompt": prompt,
+            "style": style,
+            "color_scheme": color_scheme,
+            "degraded": [],
+            "usage": {**_empty_usage(), "stages": {}},
+            "page_weight": self._page_weight(html, css, COMMON_JS) if page_weight else None
         }
+
+    def _page_weight(self, html: str, css: str, js: str) -> Dict:
+        with span("page_weight"):
+            report = analyze_page(html, css, js)
+        record_page_weight(report)
+        return report
+
+    async def _timed_stage(self, stage: str, coro: Awaitable[Dict]) -> Dict:
+        with STAGE_SECONDS.time(stage=stage), span(f"generate.{stage}", timing=stage):
+            return await coro
+
+    def _variant_temperature(self, index: int) -> float:
+        """Sampling temperature for the index-th variant, based on the component default"""
+        base = self.model_tiers.for_stage("components").temperature
+        if base is None:
+            base = _VARIANT_BASE_TEMPERATURE
+        return min(base + _VARIANT_TEMPERATURE_STEP * index, 1.0)
+
+    def _record_outcome(
+        self,
+        stage: str,
+        outcome: str,
+        sample: Optional[str] = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        """Count a model call and, unless it succeeded, log and count the fallback it caused"""
+        PARTS.inc(stage=stage)
+        MODEL_CALLS.inc(stage=stage, outcome=outcome)
+        if outcome != "ok":
+            FALLBACKS.inc(stage=stage, reason=outcome)
+            logger.warning(
+                "Model call for %s fell back to heuristics", stage,
+                exc_info=error if outcome == "exception" else None,
+                extra={
+                    "stage": stage,
+                    "component": stage if stage in COMPONENTS else None,
+                    "reason": outcome,
+                    "error": str(error) if error is not None else None,
+                    "sample": truncate(sample)
+                }
+            )
+
+    async def _call_model(self, prompt: str, stage: str, temperature: Optional[float] = None) -> str:
+        """
+        Send a prompt to the model without blocking the event loop
+        """
+        provider = self.provider
+        config = self.model_tiers.for_stage(stage)
+        if temperature is not None:
+            config = config._replace(temperature=temperature)
+        with span("model.generate", kind=KIND_CLIENT, provider=provider.name, stage=stage,
+                  model=config.model or "default") as model_span:
+            response = await asyncio.wait_for(provider.generate(prompt, config), timeout=config.timeout_s)
+            input_tokens, output_tokens = self._record_tokens(stage, prompt, response)
+            model_span.set_attribute("input_tokens", input_tokens)
+            model_span.set_attribute("output_tokens", output_tokens)
+        return response.text
+
+    def _record_tokens(self, stage: str, prompt: str, response: ModelResponse) -> Tuple[int, int]:
+        """Count a call's tokens, estimating whatever the provider did not report"""
+        estimated = response.input_tokens is None or response.output_tokens is None
+        input_tokens = response.input_tokens if response.input_tokens is not None else estimate_tokens(prompt)
+        output_tokens = response.output_tokens if response.output_tokens is not None else estimate_tokens(response.text)
+        source = "estimate" if estimated else "usage"
+        MODEL_TOKENS.inc(input_tokens, stage=stage, direction="input", source=source)
+        MODEL_TOKENS.inc(output_tokens, stage=stage, direction="output", source=source)
+        PROMPT_TOKENS.observe(input_tokens, stage=stage)
+
+        usage = _usage_var.get()
+        if usage is not None:
+            for totals in (usage, usage["stages"].setdefault(stage, _empty_usage())):
+                totals["input_tokens"] += input_tokens
+                totals["output_tokens"] += output_tokens
+                totals["calls"] += 1
+                totals["estimated"] = totals["estimated"] or estimated
+        return input_tokens, output_tokens
+
+    def _extract_json(self, text: str) -> Optional[str]:
+        """
+        Strip markdown code fences and return the outermost {...} span, if any
+        """
+        # Remove markdown code blocks if present
+        if "```json" in text:
+            text = text.split("```json")[1].split("```")[0].strip()
+        elif "```" in text:
+            text = text.split("```")[1].split("```")[0].strip()
+        
+        # Try to find JSON in the response
+        start_idx = text.find('{')
+        end_idx = text.rfind('}') + 1
+        
+        if start_idx != -1 and end_idx > start_idx:
+            return text[start_idx:end_idx]
+        return None
+    
+    def _parses(self, text: str) -> bool:
+        """Whether a model response holds valid JSON, so only usable answers are cached"""
+        json_str = self._extract_json(text)
+        if json_str is None:
+            return False
+        try:
+            json.loads(json_str)
+        except json.JSONDecodeError:
+            return False
+        return True
     
     async def _analyze_prompt(self, prompt: str) -> Dict:
         """
@@ -83,42 +537,32 @@ Example response:
 """
         
         try:
-            response = self.model.generate_content(analysis_prompt)
-            # Extract JSON from response
-            text = response.text.strip()
+            text = (await self._call_model(analysis_prompt, "analysis")).strip()
             
-            # Remove markdown code blocks if present
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
-            
-            # Try to find JSON in the response
-            start_idx = text.find('{')
-            end_idx = text.rfind('}') + 1
+            # Extract JSON from response
+            json_str = self._extract_json(text)
             
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = text[start_idx:end_idx]
+            if json_str is not None:
                 try:
                     analysis = json.loads(json_str)
-                except json.JSONDecodeError:
-                    print(f"JSON decode error in analysis: {json_str[:100]}...")
+                    self._record_outcome("analysis", "ok")
+                except json.JSONDecodeError as je:
+                    self._record_outcome("analysis", "json_fallback", sample=json_str, error=je)
                     analysis = self._heuristic_analyze(prompt)
             else:
                 # Heuristic fallback
-                print(f"No JSON found in analysis response: {text[:100]}...")
+                self._record_outcome("analysis", "json_fallback", sample=text)
                 analysis = self._heuristic_analyze(prompt)
             
             return analysis
         except Exception as e:
-            print(f"Error in analysis: {e}")
+            self._record_outcome("analysis", "exception", error=e)
             # Heuristic fallback
             return self._heuristic_analyze(prompt)
 
     def _heuristic_analyze(self, prompt: str) -> Dict:
         """Derive components and website type from prompt without AI"""
-        p = prompt.lower()
-        website_type = self._infer_website_type(p)
+        website_type = self._infer_website_type(prompt)
 
         # Choose components by website type
         components = ["navigation", "hero"]
@@ -141,47 +585,98 @@ Example response:
         self, 
         prompt: str, 
         analysis: Dict,
-        style: str
+        style: str,
+        timeout: Optional[float] = None,
+        degraded: Optional[List[str]] = None,
+        on_component: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        temperature: Optional[float] = None
     ) -> List[Dict]:
         """
-        Generate content for each component
+        Generate content for each component concurrently
+
+        Components not finished within timeout get default content and their
+        type is appended to degraded. temperature overrides the configured
+        sampling temperature of the component stages.
         """
-        components_data = []
-        component_list = analysis.get("components", [])
+        component_list = [
+            component_type
+            for component_type in analysis.get("components", [])
+            if component_type in COMPONENTS
+        ]
         website_type = analysis.get("website_type", self._infer_website_type(prompt))
+
+        async def build(component_type: str) -> Dict:
+            with COMPONENT_SECONDS.time(component=component_type), \
+                    span(f"component.{component_type}", timing=f"component.{component_type}"):
+                content = await self._generate_component_content(
+                    prompt,
+                    component_type,
+                    website_type,
+                    style,
+                    temperature=temperature
+                )
+            component = self._component_data(component_type, content)
+            if on_component is not None:
+                await on_component(component)
+            return component
         
-        for component_type in component_list:
-            if component_type not in COMPONENTS:
-                continue
-            
-            content = await self._generate_component_content(
-                prompt,
-                component_type,
-                website_type,
-                style
-            )
-            
-            components_data.append({
-                "type": component_type,
-                "html": content["html"],
-                "css": COMPONENTS[component_type].get("css", ""),
-                "js": content.get("js", "")
-            })
+        tasks = [
+            asyncio.create_task(build(component_type))
+            for component_type in component_list
+        ]
+        pending = set()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            # Retrieve every failure, not just the one raised, so none is
+            # reported as never retrieved
+            errors = [task.exception() for task in tasks if task not in pending and task.exception() is not None]
+            if errors:
+                raise errors[0]
+        
+        components_data = []
+        for component_type, task in zip(component_list, tasks):
+            if task in pending:
+                content_data = self._get_default_content(component_type, prompt)
+                template = COMPONENTS[component_type][style]
+                component = self._component_data(component_type, {
+                    "html": self._fill_template(template, content_data, component_type),
+                    "js": ""
+                })
+                if degraded is not None:
+                    degraded.append(component_type)
+                PARTS.inc(stage=component_type)
+                FALLBACKS.inc(stage=component_type, reason="deadline")
+            else:
+                component = task.result()
+            components_data.append(component)
         
         return components_data
+
+    def _component_data(self, component_type: str, content: Dict) -> Dict:
+        return {
+            "type": component_type,
+            "html": content["html"],
+            "css": COMPONENTS[component_type].get("css", ""),
+            "js": content.get("js", "")
+        }
     
     async def _generate_component_content(
         self,
         prompt: str,
         component_type: str,
         website_type: str,
-        style: str
+        style: str,
+        temperature: Optional[float] = None
     ) -> Dict:
         """
         Generate specific content for a component using AI
         """
         template = COMPONENTS[component_type][style]
         
+        # Only this component's fields, so each call pays for its own spec
         content_prompt = f"""
 You are a professional web content creator. Generate content for a {component_type} component.
 
@@ -189,57 +684,36 @@ Website description: "{prompt}"
 Website type: {website_type}
 Design style: {style}
 
-Create realistic, specific, and relevant content based on the prompt. Use details from the prompt to make the content unique and appropriate.
-
-Return ONLY a valid JSON object with these fields (adjust based on component type):
-- For navigation: brand_name, nav_items (as HTML list items)
-- For hero: title, subtitle, cta_buttons (as HTML buttons)
-- For features: section_title, section_subtitle, feature_items (as HTML divs)
-- For gallery: section_title, gallery_items (as HTML divs)
-- For contact: section_title, section_subtitle
-- For footer: brand_name, brand_description, year, footer_sections (as HTML)
+Make the content specific to this website and prompt. Do not use generic placeholders.
 
-IMPORTANT: Make content SPECIFIC to this website type and prompt. Do not use generic placeholders.
-Example response format:
-{{"section_title": "Specific Title Based on Prompt", "section_subtitle": "Specific subtitle", "feature_items": "<div>...</div>"}}
-
-RESPOND WITH ONLY THE JSON, NO OTHER TEXT:
+Return ONLY a JSON object with these fields:
+{_field_spec(component_type, style)}
 """
         
         try:
-            response = self.model.generate_content(content_prompt)
-            text = response.text.strip()
+            text = (await self._call_model(content_prompt, component_type, temperature)).strip()
             
-            # Extract JSON - be more flexible with parsing
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
-
-            start_idx = text.find('{')
-            end_idx = text.rfind('}') + 1
+            json_str = self._extract_json(text)
             
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = text[start_idx:end_idx]
+            if json_str is not None:
                 try:
                     content_data = json.loads(json_str)
+                    self._record_outcome(component_type, "ok")
                 except json.JSONDecodeError as je:
-                    print(f"JSON parse error for {component_type}: {je}")
-                    print(f"Response was: {json_str[:200]}")
+                    self._record_outcome(component_type, "json_fallback", sample=json_str, error=je)
                     content_data = self._get_default_content(component_type, prompt)
             else:
-                print(f"No JSON found in response for {component_type}")
+                self._record_outcome(component_type, "json_fallback", sample=text)
                 content_data = self._get_default_content(component_type, prompt)
             
             # Fill template with content
-            html = self._fill_template(template, content_data, component_type)
+            with span("fill_template", component=component_type):
+                html = self._fill_template(template, content_data, component_type)
             
             return {"html": html, "js": ""}
         
         except Exception as e:
-            print(f"Error generating component content for {component_type}: {e}")
-            import traceback
-            traceback.print_exc()
+            self._record_outcome(component_type, "exception", error=e)
             content_data = self._get_default_content(component_type, prompt)
             html = self._fill_template(template, content_data, component_type)
             return {"html": html, "js": ""}
@@ -248,67 +722,96 @@ RESPOND WITH ONLY THE JSON, NO OTHER TEXT:
         """
         Get content for components when AI generation fails - extract from prompt
         """
-        p = prompt.lower()
-        website_type = self._infer_website_type(p)
+        website_type = self._infer_website_type(prompt)
+        if website_type not in NAV_ITEMS:
+            website_type = "business"
         role = self._extract_role(prompt) or "professional"
-        is_portfolio = website_type == "portfolio"
-        is_blog = website_type == "blog"
-
-        defaults = {
-            "navigation": {
-                "brand_name": self._extract_brand_name(prompt),
-                "nav_items": """
-                    <li><a href="#home">Home</a></li>
-                    <li><a href="#about">About</a></li>
-                    <li><a href="#services">Services</a></li>
-                    <li><a href="#contact">Contact</a></li>
-                """
-            },
-            "hero": {
-                "title": self._compose_title(role, website_type),
-                "subtitle": self._compose_subtitle(role, website_type),
-                "cta_buttons": """
-                    <button class=\"btn btn-primary\">Get Started</button>
-                    <button class=\"btn btn-secondary\">Learn More</button>
-                """,
-                "hero_image": '<div style="width: 100%; height: 400px; background: linear-gradient(135deg, var(--bg-secondary) 0%, var(--accent) 100%); border-radius: 12px; display: flex; align-items: center; justify-content: center;"><span style="font-size: 4rem; opacity: 0.5;">✨</span></div>'
-
-            },
-            "features": {
-                "section_title": "Key Features" if not is_blog else "Highlights",
-                "section_subtitle": "What makes us unique" if not is_blog else "What you'll find here",
-                "feature_items": """
-                    <div class=\"feature-card\">\n                        <div class=\"feature-icon\">&#128640;</div>\n                        <h3>Fast & Efficient</h3>\n                        <p>Lightning-fast performance optimized for your needs</p>\n                    </div>\n                    <div class=\"feature-card\">\n                        <div class=\"feature-icon\">&#127912;</div>\n                        <h3>Beautiful Design</h3>\n                        <p>Modern, clean design that captures attention</p>\n                    </div>\n                    <div class=\"feature-card\">\n                        <div class=\"feature-icon\">&#128274;</div>\n                        <h3>Secure & Reliable</h3>\n                        <p>Enterprise-grade security and reliability</p>\n                    </div>
-                """
-            },
-            "gallery": {
-                "section_title": "Portfolio" if is_portfolio else ("Recent Posts" if is_blog else "Gallery"),
-                "gallery_items": """
-                    <div class=\"gallery-item\">\n                        <img src=\"https://via.placeholder.com/400x300/667eea/ffffff?text=Project+1\" alt=\"Project 1\">\n                        <div class=\"gallery-overlay\"><h3>Project 1</h3></div>\n                    </div>\n                    <div class=\"gallery-item\">\n                        <img src=\"https://via.placeholder.com/400x300/764ba2/ffffff?text=Project+2\" alt=\"Project 2\">\n                        <div class=\"gallery-overlay\"><h3>Project 2</h3></div>\n                    </div>\n                    <div class=\"gallery-item\">\n                        <img src=\"https://via.placeholder.com/400x300/f093fb/ffffff?text=Project+3\" alt=\"Project 3\">\n                        <div class=\"gallery-overlay\"><h3>Project 3</h3></div>\n                    </div>
-                """
-            },
-            "contact": {
-                "section_title": "Get In Touch",
-                "section_subtitle": "Work with us on your next project" if not is_blog else "Questions or collaboration ideas?"
-            },
-            "footer": {
-                "brand_name": self._extract_brand_name(prompt),
-                "brand_description": f"{role.title()} — {self._extract_service(prompt)}",
-                "year": "2026",
-                "footer_sections": """
-                    <div class=\"footer-section\">\n                        <h4>Company</h4>\n                        <ul>\n                            <li><a href=\"#\">About Us</a></li>\n                            <li><a href=\"#\">Services</a></li>\n                            <li><a href=\"#\">Blog</a></li>\n                        </ul>\n                    </div>\n                    <div class=\"footer-section\">\n                        <h4>Support</h4>\n                        <ul>\n                            <li><a href=\"#\">Contact</a></li>\n                            <li><a href=\"#\">FAQ</a></li>\n                            <li><a href=\"#\">Documentation</a></li>\n                        </ul>\n                    </div>
-                """
-            }
+        service = self._extract_service(prompt)
+        brand = self._extract_brand_name(prompt)
+        fields = {
+            "role": escape_html(role),
+            "service": escape_html(service),
+            "service_title": escape_html(service.title()),
+            "brand": escape_html(brand)
         }
 
-        return defaults.get(component_type, {})
+        if component_type == "navigation":
+            return {
+                "brand_name": fields["brand"],
+                "nav_items": "\n".join(
+                    f'<li><a href="#{anchor}">{label}</a></li>'
+                    for anchor, label in NAV_ITEMS[website_type]
+                )
+            }
+        if component_type == "hero":
+            primary, secondary = CTA_BUTTONS[website_type]
+            return {
+                "title": escape_html(self._compose_title(role, website_type)),
+                "subtitle": escape_html(self._compose_subtitle(role, website_type)),
+                "cta_buttons": (
+                    f'<button class="btn btn-primary">{primary}</button>\n'
+                    f'<button class="btn btn-secondary">{secondary}</button>'
+                ),
+                "hero_image": _HERO_IMAGE
+            }
+        if component_type == "features":
+            section_title, section_subtitle = FEATURE_HEADINGS[website_type]
+            return {
+                "section_title": section_title,
+                "section_subtitle": section_subtitle,
+                "feature_items": "\n".join(
+                    f'<div class="feature-card">\n'
+                    f'    <div class="feature-icon">{icon}</div>\n'
+                    f'    <h3>{title.format(**fields)}</h3>\n'
+                    f'    <p>{text.format(**fields)}</p>\n'
+                    f'</div>'
+                    for icon, title, text in FEATURES[website_type]
+                )
+            }
+        if component_type == "gallery":
+            section_title, items = GALLERY[website_type]
+            return {
+                "section_title": section_title,
+                "gallery_items": "\n".join(
+                    f'<div class="gallery-item">\n'
+                    f'    <img src="https://via.placeholder.com/400x300/{color}/ffffff?text={title.replace(" ", "+")}" alt="{title}">\n'
+                    f'    <div class="gallery-overlay"><h3>{title}</h3></div>\n'
+                    f'</div>'
+                    for title, color in zip(items, GALLERY_COLORS)
+                )
+            }
+        if component_type == "contact":
+            return {
+                "section_title": "Get In Touch",
+                "section_subtitle": CONTACT_SUBTITLES[website_type]
+            }
+        if component_type == "footer":
+            return {
+                "brand_name": fields["brand"],
+                "brand_description": f"{fields['role'].title()} — {fields['service']}",
+                "year": str(datetime.utcnow().year),
+                "footer_sections": "\n".join(
+                    f'<div class="footer-section">\n'
+                    f'    <h4>{heading}</h4>\n'
+                    f'    <ul>\n'
+                    + "".join(f'        <li><a href="#">{link}</a></li>\n' for link in links)
+                    + '    </ul>\n'
+                    '</div>'
+                    for heading, links in FOOTER_SECTIONS[website_type]
+                )
+            }
+        return {}
     
     def _extract_brand_name(self, prompt: str) -> str:
         """Extract a brand name from the prompt"""
-        # Simple heuristic: use first significant word or common pattern
-        words = prompt.split()
-        if len(words) > 0:
-            return words[0].capitalize()
+        # Prefer an explicit name ("called Acme", quoted names), then the
+        # first significant word
+        match = _BRAND_PATTERN.search(prompt)
+        if match:
+            return (match.group(1) or match.group(2)).strip()
+        for word in _WORD_PATTERN.findall(prompt):
+            if word.lower() not in BRAND_STOPWORDS:
+                return word.capitalize()
         return "My Website"
     
     def _extract_title(self, prompt: str) -> str:
@@ -328,47 +831,15 @@ RESPOND WITH ONLY THE JSON, NO OTHER TEXT:
     
     def _extract_service(self, prompt: str) -> str:
         """Extract what service/product is offered"""
-        if "mobile" in prompt.lower():
-            return "mobile development"
-        elif "software" in prompt.lower():
-            return "software solutions"
-        elif "portfolio" in prompt.lower():
-            return "portfolio services"
-        elif "blog" in prompt.lower():
-            return "content creation"
-        return "professional services"
+        return classify(prompt).service
 
     def _infer_website_type(self, p: str) -> str:
         """Infer website type from prompt string (already lowercased or not)"""
-        pl = p.lower() if not p.islower() else p
-        if any(k in pl for k in ["portfolio", "photographer", "designer", "developer portfolio"]):
-            return "portfolio"
-        if any(k in pl for k in ["blog", "writer", "journal", "articles"]):
-            return "blog"
-        if any(k in pl for k in ["shop", "store", "ecommerce", "products"]):
-            return "ecommerce"
-        if any(k in pl for k in ["landing", "launch", "signup"]):
-            return "landing"
-        return "business"
+        return classify(p).website_type
 
     def _extract_role(self, prompt: str) -> str:
         """Small heuristic to extract the role or subject from prompt"""
-        pl = prompt.lower()
-        candidates = [
-            ("mobile developer", ["mobile developer", "android developer", "ios developer"]),
-            ("software developer", ["software developer", "software engineer", "full stack developer", "backend developer", "frontend developer"]),
-            ("photographer", ["photographer", "photography"]),
-            ("travel writer", ["travel writer", "travel blogger"]),
-            ("restaurant", ["restaurant", "cafe", "bistro"]),
-            ("saas startup", ["saas", "startup"]),
-        ]
-        for label, keys in candidates:
-            if any(k in pl for k in keys):
-                return label
-        # Fallback: use noun after "for" if present
-        if " for " in pl:
-            return pl.split(" for ", 1)[1].strip()
-        return "professional"
+        return classify(prompt).role
 
     def _compose_title(self, role: str, website_type: str) -> str:
         if website_type == "portfolio":
@@ -402,11 +873,19 @@ RESPOND WITH ONLY THE JSON, NO OTHER TEXT:
             html = html.replace(placeholder, str(value))
         
         # Remove any unfilled placeholders
-        import re
         html = re.sub(r'\{[^}]+\}', '', html)
         
         return html
     
+    def _heuristic_meta(self, prompt: str) -> Dict:
+        """Derive title and description from prompt without AI"""
+        website_type = self._infer_website_type(prompt)
+        role = self._extract_role(prompt) or "professional"
+        return {
+            "title": self._compose_title(role, website_type)[:60],
+            "description": self._compose_subtitle(role, website_type)[:160]
+        }
+    
     async def _generate_meta_info(self, prompt: str) -> Dict:
         """
         Generate meta information (title, description) for the website
@@ -420,34 +899,24 @@ Return ONLY a JSON object with:
 """
         
         try:
-            response = self.model.generate_content(meta_prompt)
-            text = response.text.strip()
+            text = (await self._call_model(meta_prompt, "meta")).strip()
             
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
-
-            start_idx = text.find('{')
-            end_idx = text.rfind('}') + 1
+            json_str = self._extract_json(text)
             
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = text[start_idx:end_idx]
-                meta_info = json.loads(json_str)
+            if json_str is not None:
+                try:
+                    meta_info = json.loads(json_str)
+                    self._record_outcome("meta", "ok")
+                    return meta_info
+                except json.JSONDecodeError as je:
+                    self._record_outcome("meta", "json_fallback", sample=json_str, error=je)
             else:
-                meta_info = {
-                    "title": "My Website",
-                    "description": "Welcome to our website"
-                }
-            
-            return meta_info
+                self._record_outcome("meta", "json_fallback", sample=text)
+            return self._heuristic_meta(prompt)
         
         except Exception as e:
-            print(f"Error generating meta info: {e}")
-            return {
-                "title": "My Website",
-                "description": "Welcome to our website"
-            }
+            self._record_outcome("meta", "exception", error=e)
+            return self._heuristic_meta(prompt)
     
     def _assemble_html(
         self, 
@@ -460,14 +929,17 @@ Return ONLY a JSON object with:
         Assemble full HTML document
         """
         components_html = "\n".join([comp["html"] for comp in components])
+        # Meta text comes from the prompt or the model, so it is escaped like component text
+        title = escape_html(str(meta_info['title']))
+        description = escape_html(str(meta_info['description']))
         
         html = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="{meta_info['description']}">
-    <title>{meta_info['title']}</title>
+    <meta name="description" content="{description}">
+    <title>{title}</title>
     <link rel="stylesheet" href="styles.css">
 </head>
 <body>
@@ -0,0 +1,63 @@
+"""
+Bounded-concurrency execution of many generation requests
+
+Identical requests within a batch are generated once and their result is
+reported for every position they appear at. Results are yielded in
+completion order so callers can stream them as soon as they are ready.
+"""
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+from .metrics import counter
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BATCH_ITEMS = counter(
+    "generate_batch_items_total",
+    "Batch items by outcome (ok, error, deduplicated)",
+    ("outcome",)
+)
+
+
+async def run_deduplicated(
+    items: Sequence[T],
+    key: Callable[[T], Hashable],
+    worker: Callable[[T], Awaitable[R]],
+    concurrency: int
+) -> AsyncIterator[Tuple[List[int], Optional[R], Optional[BaseException]]]:
+    """
+    Run worker once per distinct key with at most concurrency calls at a time
+
+    Yields (indices, result, error) for each distinct item as it finishes,
+    where indices are all positions of that item in items. Work still running
+    when the consumer stops iterating is cancelled.
+    """
+    groups: Dict[Hashable, List[int]] = {}
+    for index, item in enumerate(items):
+        groups.setdefault(key(item), []).append(index)
+    BATCH_ITEMS.inc(len(items) - len(groups), outcome="deduplicated")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def guarded(item: T) -> R:
+        async with semaphore:
+            return await worker(item)
+
+    tasks = {
+        asyncio.create_task(guarded(items[indices[0]])): indices
+        for indices in groups.values()
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                indices = tasks[task]
+                error = task.exception()
+                BATCH_ITEMS.inc(len(indices), outcome="error" if error else "ok")
+                yield indices, None if error else task.result(), error
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,155 @@
+"""
+Record/replay cassettes for model calls
+
+In record mode every prompt/response pair that passes through the wrapped
+provider is saved to disk, keyed by a hash of the prompt and its model and
+sampling settings, together with its latency. Replay mode serves the recorded responses back deterministically,
+optionally re-creating the recorded latency, without touching the network.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from .metrics import register_cache
+from .providers import ModelConfig, ModelProvider, ModelResponse, ProviderError
+
+
+class CassetteMiss(ProviderError):
+    """Raised in replay mode when no recording exists for a prompt"""
+
+
+def prompt_key(prompt: str, config: Optional[ModelConfig] = None) -> str:
+    """
+    Recording key for a prompt and the settings that change its output
+
+    Recordings made with a stage-specific model or with non-default sampling
+    settings (such as the raised temperature of extra variants) are kept
+    apart; a call with no settings keeps the plain prompt hash.
+    """
+    key = prompt
+    if config is not None:
+        if config.temperature is not None or config.max_output_tokens is not None:
+            key = f"{config.model}\n{config.temperature}\n{config.max_output_tokens}\n{prompt}"
+        elif config.model:
+            key = f"{config.model}\n{prompt}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """One JSON file per prompt hash, sharded by the first two hex digits"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, entry: Dict) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class CassetteProvider(ModelProvider):
+    """Wraps a provider to record its calls, or replaces it to replay them"""
+
+    name = "cassette"
+
+    def __init__(
+        self,
+        store: CassetteStore,
+        mode: str,
+        inner: Optional[ModelProvider] = None,
+        latency_scale: float = 1.0
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("Record mode needs a provider to record from")
+        self.store = store
+        self.mode = mode
+        self.inner = inner
+        self.latency_scale = latency_scale
+        self.hits = 0
+        self.misses = 0
+        if mode == "replay":
+            register_cache("cassette", lambda: (self.hits, self.misses))
+
+    async def generate(self, prompt: str, config: Optional[ModelConfig] = None) -> ModelResponse:
+        key = prompt_key(prompt, config)
+        if self.mode == "replay":
+            entry = await asyncio.to_thread(self.store.load, key)
+            if entry is None:
+                self.misses += 1
+                raise CassetteMiss(f"No cassette recorded for prompt {key[:12]}")
+            self.hits += 1
+            if self.latency_scale > 0:
+                await asyncio.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+            if entry.get("error"):
+                raise ProviderError(entry["error"])
+            return ModelResponse(
+                text=entry["text"],
+                input_tokens=entry.get("input_tokens"),
+                output_tokens=entry.get("output_tokens")
+            )
+
+        start = time.perf_counter()
+        entry = {
+            "prompt": prompt,
+            "provider": self.inner.name,
+            "model": config.model if config else None,
+            "temperature": config.temperature if config else None,
+            "max_output_tokens": config.max_output_tokens if config else None,
+            "recorded_at": datetime.utcnow().isoformat()
+        }
+        try:
+            response = await self.inner.generate(prompt, config)
+        except Exception as e:
+            entry.update(text=None, error=str(e), latency_ms=(time.perf_counter() - start) * 1000)
+            await asyncio.to_thread(self.store.save, key, entry)
+            raise
+        entry.update(
+            text=response.text,
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+            error=None,
+            latency_ms=(time.perf_counter() - start) * 1000
+        )
+        await asyncio.to_thread(self.store.save, key, entry)
+        return response
+
+
+def wrap_with_cassette(provider_factory) -> Optional[ModelProvider]:
+    """
+    Apply MODEL_CASSETTE_MODE (record or replay) to the configured provider
+
+    Returns None when cassettes are disabled. Replay mode never builds the
+    underlying provider, so it needs no API key.
+    """
+    mode = os.getenv("MODEL_CASSETTE_MODE", "")
+    if not mode:
+        return None
+    store = CassetteStore(Path(os.getenv("MODEL_CASSETTE_DIR", "cassettes")))
+    return CassetteProvider(
+        store,
+        mode,
+        inner=provider_factory() if mode == "record" else None,
+        latency_scale=float(os.getenv("MODEL_CASSETTE_LATENCY_SCALE", "1"))
+    )
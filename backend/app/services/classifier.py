@@ -0,0 +1,94 @@
+"""
+Keyword classifier for prompts: website type, role and service in one pass
+
+The taxonomy lives in templates/taxonomy.json (or the file named by
+TAXONOMY_PATH). Within each dimension labels are listed by priority and a
+label matches when any of its keywords occurs anywhere in the prompt.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .metrics import register_cache
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).parent.parent / "templates" / "taxonomy.json"
+DIMENSIONS = ("website_types", "roles", "services")
+
+
+class PromptTraits(NamedTuple):
+    website_type: str
+    role: str
+    service: str
+
+
+class KeywordClassifier:
+    def __init__(self, taxonomy: Dict):
+        self.defaults: List[Optional[str]] = []
+        # keyword -> (dimension index, priority, label) for every label it implies
+        hits: Dict[str, List[Tuple[int, int, str]]] = {}
+        for dimension_index, dimension in enumerate(DIMENSIONS):
+            spec = taxonomy.get(dimension, {})
+            self.defaults.append(spec.get("default"))
+            for priority, entry in enumerate(spec.get("labels", [])):
+                for keyword in entry["keywords"]:
+                    hits.setdefault(keyword.lower(), []).append(
+                        (dimension_index, priority, entry["label"])
+                    )
+
+        # The matcher reports only the longest keyword starting at each
+        # position, so a keyword also carries the hits of every keyword it
+        # contains ("travel writer" implies "writer")
+        self._hits = {
+            keyword: [hit for other, other_hits in hits.items() if other in keyword for hit in other_hits]
+            for keyword in hits
+        }
+        alternatives = sorted(hits, key=len, reverse=True)
+        # Zero-width lookahead so matches may overlap, as with repeated `in` checks
+        self._pattern = re.compile(
+            "(?=(" + "|".join(re.escape(keyword) for keyword in alternatives) + "))"
+        ) if alternatives else None
+
+    @classmethod
+    def from_file(cls, path: Path) -> "KeywordClassifier":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def classify(self, prompt: str) -> PromptTraits:
+        lowered = prompt.lower()
+        best: List[Optional[Tuple[int, str]]] = [None] * len(DIMENSIONS)
+        if self._pattern is not None:
+            for match in self._pattern.finditer(lowered):
+                for dimension_index, priority, label in self._hits[match.group(1)]:
+                    current = best[dimension_index]
+                    if current is None or priority < current[0]:
+                        best[dimension_index] = (priority, label)
+
+        website_type, role, service = (
+            found[1] if found else default
+            for found, default in zip(best, self.defaults)
+        )
+        if role is None:
+            # Fallback: use noun after "for" if present
+            if " for " in lowered:
+                role = lowered.split(" for ", 1)[1].strip()
+            else:
+                role = "professional"
+        return PromptTraits(website_type or "business", role, service or "professional services")
+
+
+@lru_cache(maxsize=None)
+def get_classifier() -> KeywordClassifier:
+    """Compile the configured taxonomy once per process"""
+    return KeywordClassifier.from_file(Path(os.getenv("TAXONOMY_PATH") or DEFAULT_TAXONOMY_PATH))
+
+
+@lru_cache(maxsize=4096)
+def classify(prompt: str) -> PromptTraits:
+    """Classify a prompt with the configured taxonomy, memoized per prompt"""
+    return get_classifier().classify(prompt)
+
+
+register_cache("prompt_classifier", lambda: classify.cache_info()[:2])
@@ -0,0 +1,280 @@
+"""
+Asynchronous generation jobs, persisted in MongoDB and processed by a local
+worker pool. Any API process can read job state, and queued jobs survive
+restarts because workers claim them from the database with a lease.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from .ai_service import AIService
+from ..models.database import database_mode, object_id
+from .tracing import span
+from .structured_logging import request_id_var
+
+if TYPE_CHECKING:
+    from bson import ObjectId
+
+JOBS_COLLECTION = "generation_jobs"
+
+logger = logging.getLogger(__name__)
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class JobStore:
+    def __init__(self, db, lease_s: float = 300.0, max_attempts: int = 3):
+        self.collection = db[JOBS_COLLECTION]
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+
+    def _span(self, operation: str):
+        return span(f"mongo.{operation}", timing="mongo", **{"db.collection": JOBS_COLLECTION})
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("status", 1), ("created_at", 1)])
+
+    async def create(self, request: Dict) -> str:
+        now = datetime.utcnow()
+        with self._span("insert_one"):
+            result = await self.collection.insert_one({
+                "status": "queued",
+                "request": request,
+                "partial_components": [],
+                "result": None,
+                "error": None,
+                "attempts": 0,
+                "created_at": now,
+                "updated_at": now
+            })
+        return str(result.inserted_id)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        with self._span("find_one"):
+            job = await self.collection.find_one({"_id": object_id(job_id)})
+        if job:
+            job["id"] = str(job.pop("_id"))
+        return job
+
+    async def claim(self, worker_id: str) -> Optional[Dict]:
+        """
+        Atomically take the oldest queued job, or a running job whose
+        worker stopped renewing its lease
+        """
+        from pymongo import ReturnDocument
+
+        now = datetime.utcnow()
+        with self._span("find_one_and_update"):
+            return await self.collection.find_one_and_update(
+                {"$or": [
+                    {"status": "queued"},
+                    {"status": "running", "lease_until": {"$lt": now}}
+                ]},
+                {
+                    "$set": {
+                        "status": "running",
+                        "worker_id": worker_id,
+                        "lease_until": now + timedelta(seconds=self.lease_s),
+                        "partial_components": [],
+                        "updated_at": now
+                    },
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("created_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+
+    @staticmethod
+    def _owned(job_id: "ObjectId", worker_id: str) -> Dict:
+        """Filter matching the job only while worker_id still holds its lease"""
+        return {"_id": job_id, "status": "running", "worker_id": worker_id}
+
+    async def renew_lease(self, job_id: "ObjectId", worker_id: str) -> bool:
+        """Extend the lease; False if another worker has since re-claimed the job"""
+        with self._span("update_one"):
+            update = await self.collection.update_one(
+                self._owned(job_id, worker_id),
+                {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=self.lease_s)}}
+            )
+        return update.matched_count > 0
+
+    async def add_partial(self, job_id: "ObjectId", worker_id: str, component: Dict) -> None:
+        now = datetime.utcnow()
+        with self._span("update_one"):
+            await self.collection.update_one(
+                self._owned(job_id, worker_id),
+                {
+                    "$push": {"partial_components": component},
+                    "$set": {"lease_until": now + timedelta(seconds=self.lease_s), "updated_at": now}
+                }
+            )
+
+    async def complete(self, job_id: "ObjectId", worker_id: str, result: Dict) -> bool:
+        """Record the result; False if another worker has since re-claimed the job"""
+        with self._span("update_one"):
+            update = await self.collection.update_one(
+                self._owned(job_id, worker_id),
+                {"$set": {"status": "completed", "result": result, "updated_at": datetime.utcnow()}}
+            )
+        return update.matched_count > 0
+
+    async def fail(self, job_id: "ObjectId", worker_id: str, error: str) -> bool:
+        """Record the failure; False if another worker has since re-claimed the job"""
+        with self._span("update_one"):
+            update = await self.collection.update_one(
+                self._owned(job_id, worker_id),
+                {"$set": {"status": "failed", "error": error, "updated_at": datetime.utcnow()}}
+            )
+        return update.matched_count > 0
+
+
+class JobWorkerPool:
+    """Runs generation jobs from a JobStore on a fixed number of asyncio workers"""
+
+    def __init__(
+        self,
+        store: JobStore,
+        ai_service_factory: Callable[[], AIService],
+        workers: int = 2,
+        poll_interval: float = 1.0
+    ):
+        self.store = store
+        self.ai_service_factory = ai_service_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._instance = uuid.uuid4().hex[:8]
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            worker_id = f"{self._instance}-{index}"
+            self._tasks.append(asyncio.create_task(self._run(worker_id)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was queued by this process"""
+        self._wake.set()
+
+    async def _run(self, worker_id: str) -> None:
+        try:
+            await self.store.ensure_indexes()
+        except Exception as e:
+            logger.warning("Could not create job indexes: %s", e)
+
+        while True:
+            try:
+                job = await self.store.claim(worker_id)
+            except Exception:
+                logger.exception("Error claiming generation job")
+                job = None
+
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._process(job)
+            except Exception:
+                logger.exception("Error recording generation job", extra={"job_id": str(job["_id"])})
+
+    async def _process(self, job: Dict) -> None:
+        # Each job is traced on its own, outside of the request that queued it,
+        # and its ID serves as the request ID of its log records
+        token = request_id_var.set(str(job["_id"]))
+        try:
+            with span("job.process", job_id=str(job["_id"]), attempt=job.get("attempts", 1)):
+                await self._run_job(job)
+        finally:
+            request_id_var.reset(token)
+
+    async def _run_job(self, job: Dict) -> None:
+        job_id = job["_id"]
+        worker_id = job["worker_id"]
+        if job.get("attempts", 1) > self.store.max_attempts:
+            await self.store.fail(job_id, worker_id, "Job exceeded maximum attempts")
+            return
+
+        async def on_component(component: Dict) -> None:
+            await self.store.add_partial(job_id, worker_id, component)
+
+        async def heartbeat() -> None:
+            # A single model call can outlast the lease, so renew it while the
+            # job runs rather than only when a component is written
+            while True:
+                await asyncio.sleep(self.store.lease_s / 3)
+                try:
+                    if not await self.store.renew_lease(job_id, worker_id):
+                        return
+                except Exception:
+                    logger.exception("Error renewing generation job lease", extra={"job_id": str(job_id)})
+
+        renewing = asyncio.create_task(heartbeat())
+        try:
+            request = job["request"]
+            result = await self.ai_service_factory().generate_website(
+                prompt=request["prompt"],
+                style=request.get("style") or "modern",
+                color_scheme=request.get("color_scheme") or "default",
+                deadline_ms=request.get("deadline_ms"),
+                on_component=on_component,
+                mode=request.get("mode") or "ai",
+                variants=request.get("variants") or 1,
+                variant_color_schemes=request.get("variant_color_schemes"),
+                page_weight=request.get("page_weight", False)
+            )
+            recorded = await self.store.complete(job_id, worker_id, result)
+        except Exception as e:
+            logger.exception("Error processing generation job", extra={"job_id": str(job_id)})
+            recorded = await self.store.fail(job_id, worker_id, f"Error generating website: {str(e)}")
+        finally:
+            renewing.cancel()
+            await asyncio.gather(renewing, return_exceptions=True)
+        if not recorded:
+            logger.warning("Lease on generation job lost to another worker", extra={"job_id": str(job_id)})
+
+
+def external_workers() -> bool:
+    """Whether GENERATION_EXTERNAL_WORKERS says python -m app.worker processes run the queued jobs"""
+    return os.getenv("GENERATION_EXTERNAL_WORKERS", "").lower() in ("1", "true", "yes")
+
+
+def pool_from_env(db_factory: Callable, ai_service_factory: Callable[[], AIService]) -> Optional[JobWorkerPool]:
+    """
+    Build the worker pool configured by GENERATION_WORKERS, or None if disabled
+
+    Defaults to 2 workers, or none in serverless mode, where nothing runs
+    between invocations. The database is only opened when there are workers,
+    so a process without them starts without connecting to MongoDB.
+    """
+    default_workers = "0" if database_mode() == "serverless" else "2"
+    workers = int(os.getenv("GENERATION_WORKERS") or default_workers)
+    if workers <= 0:
+        return None
+    return build_pool(db_factory(), ai_service_factory, workers)
+
+
+def build_pool(db, ai_service_factory: Callable[[], AIService], workers: int) -> JobWorkerPool:
+    """Worker pool over db, with the lease, attempt and polling settings from the environment"""
+    store = JobStore(
+        db,
+        lease_s=float(os.getenv("GENERATION_JOB_LEASE_S", "300")),
+        max_attempts=int(os.getenv("GENERATION_JOB_MAX_ATTEMPTS", "3"))
+    )
+    return JobWorkerPool(
+        store,
+        ai_service_factory,
+        workers=workers,
+        poll_interval=float(os.getenv("GENERATION_JOB_POLL_S", "1"))
+    )
@@ -0,0 +1,79 @@
+"""
+Per-stage model settings
+
+Every generation stage (analysis, meta and each component type) can use its
+own model, temperature, output limit and timeout, so short classification
+calls can go to a fast, cheap model while content stays on a stronger one.
+
+Settings are resolved per stage from the "default" scope, then "components"
+for component types, then the stage itself. Each scope is read from the JSON
+file at MODEL_CONFIG_PATH and then from environment variables, which win:
+
+    {
+      "default": {"model": "gemini-pro"},
+      "analysis": {"model": "gemini-1.5-flash", "temperature": 0, "max_output_tokens": 256, "timeout_s": 5},
+      "meta": {"model": "gemini-1.5-flash", "max_output_tokens": 128}
+    }
+
+Environment variables are named MODEL_<SCOPE>_<SETTING>, for example
+MODEL_ANALYSIS_NAME, MODEL_COMPONENTS_TEMPERATURE or MODEL_HERO_TIMEOUT_S,
+and MODEL_NAME, MODEL_TEMPERATURE, MODEL_MAX_OUTPUT_TOKENS and
+MODEL_TIMEOUT_S for the default scope.
+"""
+import json
+import os
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from .providers import ModelConfig
+from ..templates.components import COMPONENTS
+
+# Config key -> (environment suffix, parser)
+_SETTINGS: Dict[str, Tuple[str, Callable[[str], object]]] = {
+    "model": ("NAME", str),
+    "temperature": ("TEMPERATURE", float),
+    "max_output_tokens": ("MAX_OUTPUT_TOKENS", int),
+    "timeout_s": ("TIMEOUT_S", float),
+}
+
+
+class ModelTiers:
+    """Resolves the ModelConfig for each stage from scoped settings"""
+
+    def __init__(self, scopes: Optional[Dict[str, Dict]] = None):
+        self.scopes = scopes or {}
+        for scope, settings in self.scopes.items():
+            unknown = set(settings) - set(_SETTINGS)
+            if unknown:
+                raise ValueError(f"Unknown model settings for {scope}: {', '.join(sorted(unknown))}")
+        self._resolved: Dict[str, ModelConfig] = {}
+
+    def for_stage(self, stage: str) -> ModelConfig:
+        config = self._resolved.get(stage)
+        if config is None:
+            settings: Dict = {}
+            for scope in self._chain(stage):
+                settings.update(self.scopes.get(scope, {}))
+            config = self._resolved[stage] = ModelConfig(**settings)
+        return config
+
+    @staticmethod
+    def _chain(stage: str) -> Iterable[str]:
+        if stage in COMPONENTS:
+            return ("default", "components", stage)
+        return ("default", stage)
+
+    @classmethod
+    def from_env(cls) -> "ModelTiers":
+        scopes: Dict[str, Dict] = {}
+        path = os.getenv("MODEL_CONFIG_PATH")
+        if path:
+            with open(path, encoding="utf-8") as f:
+                scopes = json.load(f)
+
+        for scope in ("default", "components", "analysis", "meta", *COMPONENTS):
+            prefix = "MODEL_" if scope == "default" else f"MODEL_{scope.upper()}_"
+            for key, (suffix, parse) in _SETTINGS.items():
+                value = os.getenv(prefix + suffix)
+                if value:
+                    scopes.setdefault(scope, {})[key] = parse(value)
+        return cls(scopes)
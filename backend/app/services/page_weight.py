@@ -0,0 +1,351 @@
+"""
+Page weight of generated sites, checked against performance budgets
+
+analyze_page reports what a browser would download and build for a page:
+raw and gzipped sizes of the HTML, CSS and JS, the DOM's element count and
+nesting depth, the stylesheet's rules and selectors (and which selectors
+match nothing in the page), and the number of resources fetched besides the
+document itself.
+
+Each document is read once, front to back: the HTML by a tag scanner that
+records element names, classes, ids and fetched URLs as it goes, then the
+stylesheet by a single tokenizing scan that records what every selector
+needs, checked against what the HTML (and the script, for classes it
+toggles) used. Both are regex scans rather than full parsers. Generated
+pages share a handful of stylesheets and one script, so their scans and
+gzipped sizes are cached, and a report mostly costs the HTML scan.
+
+Budgets are read from PAGE_BUDGET_<METRIC> environment variables, for example
+PAGE_BUDGET_TOTAL_GZIP_BYTES=60000 or PAGE_BUDGET_DOM_NODES=800; 0 turns a
+budget off.
+"""
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from .metrics import counter, histogram
+
+PAGE_BYTES = histogram(
+    "generated_page_bytes",
+    "Gzipped size of generated pages, by asset",
+    ("asset",),
+    buckets=(2500, 5000, 10000, 20000, 40000, 80000, 160000)
+)
+OVER_BUDGET = counter(
+    "page_budget_exceeded_total",
+    "Generated pages over a page weight budget, by budget",
+    ("metric",)
+)
+
+# Budget metric -> default limit
+DEFAULT_BUDGETS: Dict[str, int] = {
+    "html_gzip_bytes": 30000,
+    "css_gzip_bytes": 20000,
+    "js_gzip_bytes": 20000,
+    "total_gzip_bytes": 60000,
+    "dom_nodes": 800,
+    "dom_depth": 32,
+    "css_rules": 500,
+    "unused_selectors": 50,
+    "external_requests": 10
+}
+
+# Unused selectors listed in a report; the count covers all of them
+_MAX_LISTED_SELECTORS = 50
+
+_VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+})
+# Element -> attributes holding a URL the browser fetches
+_FETCHED_ATTRIBUTES: Dict[str, Tuple[str, ...]] = {
+    "script": ("src",),
+    "img": ("src",),
+    "iframe": ("src",),
+    "source": ("src",),
+    "video": ("src", "poster"),
+    "audio": ("src",),
+    "embed": ("src",),
+    "object": ("data",),
+    "input": ("src",),
+    "track": ("src",)
+}
+_FETCHED_LINK_RELS = frozenset({"stylesheet", "icon", "shortcut", "apple-touch-icon", "preload", "modulepreload", "manifest"})
+# Element -> pattern for the end of its text body
+_RAW_TEXT_END = {tag: re.compile(rf"</{tag}\s*>", re.IGNORECASE) for tag in ("script", "style")}
+
+_HTML_TAG = re.compile(
+    r"<!--.*?-->"                                                       # comment
+    r"|<![^>]*>"                                                        # doctype
+    r"|</([a-zA-Z][\w:-]*)\s*>"                                         # end tag
+    r"|<([a-zA-Z][\w:-]*)"                                              # start tag name
+    r"((?:\s+[^\s\"'>/=]+(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'>]+))?)*)"   # attributes
+    r"\s*(/?)>",
+    re.DOTALL
+)
+_HTML_ATTRIBUTE = re.compile(r"([^\s\"'>/=]+)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+)))?")
+
+# At-rules whose blocks hold style rules; other blocks (@keyframes,
+# @font-face, @page) hold no selectors
+_GROUPING_AT_RULES = frozenset({"media", "supports", "layer", "container", "document", "scope"})
+
+_CSS_TOKEN = re.compile(
+    r"/\*.*?(?:\*/|$)"                  # comment
+    r"|\"(?:\\.|[^\"\\])*\"?"           # double-quoted string
+    r"|'(?:\\.|[^'\\])*'?"              # single-quoted string
+    r"|[{};]"                           # structure
+    r"|[^{};\"'/]+"                     # anything else up to the next of the above
+    r"|/",
+    re.DOTALL
+)
+# Declaration text up to the next { or } outside strings and comments
+_CSS_DECLARATIONS = re.compile(r"(?:[^{}\"'/]+|\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|/\*.*?\*/|/)*", re.DOTALL)
+_CSS_URL = re.compile(r"url\(\s*[\"']?([^)\s'\"]+)")
+_IMPORT_URL = re.compile(r"@import\s+(?:url\(\s*)?[\"']?([^\"')\s;]+)")
+
+# Parts of a selector that do not need anything to exist in the page
+_SELECTOR_IGNORED = re.compile(r"::?[\w-]+(?:\([^)]*\))?|\[[^\]]*\]|\*")
+_SELECTOR_CLASS = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_SELECTOR_ID = re.compile(r"#(-?[_a-zA-Z][\w-]*)")
+_SELECTOR_TYPE = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+# Classes a script adds at runtime, which the HTML does not contain yet
+_SCRIPT_CLASS = re.compile(r"classList\.(?:add|toggle|replace)\(\s*['\"]([\w-]+)['\"]")
+
+
+@lru_cache(maxsize=None)
+def get_budgets() -> Dict[str, int]:
+    """Budgets from the environment, read on first use after .env is loaded"""
+    budgets = {}
+    for metric, default in DEFAULT_BUDGETS.items():
+        value = int(os.getenv(f"PAGE_BUDGET_{metric.upper()}", str(default)))
+        if value > 0:
+            budgets[metric] = value
+    return budgets
+
+
+def _sizes(text: str) -> Dict[str, int]:
+    data = text.encode("utf-8")
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return {"raw": len(data), "gzip": len(compressor.compress(data)) + len(compressor.flush())}
+
+
+@lru_cache(maxsize=256)
+def _shared_sizes(text: str) -> Tuple[int, int]:
+    """Raw and gzipped size of a stylesheet or script, which many pages share"""
+    sizes = _sizes(text)
+    return sizes["raw"], sizes["gzip"]
+
+
+def _is_fetched(url: Optional[str]) -> bool:
+    return bool(url) and not url.startswith(("data:", "#", "javascript:", "about:"))
+
+
+class _Page:
+    """What the HTML contains that selectors can match, plus its DOM shape and fetched URLs"""
+
+    def __init__(self):
+        self.nodes = 0
+        self.max_depth = 0
+        self.tags: Set[str] = set()
+        self.classes: Set[str] = set()
+        self.ids: Set[str] = set()
+        self.urls: Set[str] = set()
+
+    def add_element(self, tag: str, attributes: Dict[str, str]) -> None:
+        self.tags.add(tag)
+        if attributes.get("class"):
+            self.classes.update(attributes["class"].split())
+        if attributes.get("id"):
+            self.ids.add(attributes["id"])
+        if tag == "link":
+            rels = set(attributes.get("rel", "").lower().split())
+            if rels & _FETCHED_LINK_RELS and _is_fetched(attributes.get("href")):
+                self.urls.add(attributes["href"])
+        for attribute in _FETCHED_ATTRIBUTES.get(tag, ()):
+            if _is_fetched(attributes.get(attribute)):
+                self.urls.add(attributes[attribute])
+
+
+def _attributes(text: str) -> Dict[str, str]:
+    return {
+        match.group(1).lower(): next((value for value in match.group(2, 3, 4) if value is not None), "")
+        for match in _HTML_ATTRIBUTE.finditer(text)
+    }
+
+
+def _scan_html(html: str) -> _Page:
+    """Walk the page's tags once, tracking open elements for the nesting depth"""
+    page = _Page()
+    open_elements: List[str] = []
+    match = _HTML_TAG.search(html)
+    while match:
+        position = match.end()
+        opened, attributes, self_closing, closed = match.group(2, 3, 4, 1)
+        if opened:
+            tag = opened.lower()
+            page.nodes += 1
+            page.max_depth = max(page.max_depth, len(open_elements) + 1)
+            page.add_element(tag, _attributes(attributes) if attributes else {})
+            if not self_closing and tag not in _VOID_ELEMENTS:
+                open_elements.append(tag)
+            if tag in _RAW_TEXT_END:
+                # Script and style bodies are text, not markup
+                end = _RAW_TEXT_END[tag].search(html, position)
+                position = end.start() if end else len(html)
+        elif closed:
+            tag = closed.lower()
+            # Close up to the matching element, as a browser would for unclosed children
+            if tag in open_elements:
+                while open_elements.pop() != tag:
+                    pass
+        match = _HTML_TAG.search(html, position)
+    return page
+
+
+class _Stylesheet(NamedTuple):
+    """What a stylesheet contains, independent of the page it is used on"""
+    rules: int
+    # Each selector with the classes, ids and element names it needs to match
+    selectors: Tuple[Tuple[str, FrozenSet[str], FrozenSet[str], FrozenSet[str]], ...]
+    urls: FrozenSet[str]
+
+
+def _selector_requirements(selector: str) -> Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]:
+    """The classes, ids and element names that must all occur in a page for selector to match"""
+    compound = _SELECTOR_IGNORED.sub(" ", selector)
+    names_only = _SELECTOR_ID.sub(" ", _SELECTOR_CLASS.sub(" ", compound))
+    return (
+        frozenset(_SELECTOR_CLASS.findall(compound)),
+        frozenset(_SELECTOR_ID.findall(compound)),
+        frozenset(name.lower() for name in _SELECTOR_TYPE.findall(names_only))
+    )
+
+
+@lru_cache(maxsize=256)
+def _parse_css(css: str) -> _Stylesheet:
+    """
+    Collect rules, selectors and fetched URLs in one tokenizing pass
+
+    Generated stylesheets depend only on the color scheme and component
+    types, so the same few are analyzed over and over; caching on the text
+    leaves only the per-page selector check for a repeated stylesheet.
+    """
+    rules = 0
+    selectors = []
+    urls: Set[str] = set()
+    # Kind of each open block: "rules" holds style rules, "other" holds
+    # declarations or blocks without selectors (@keyframes steps)
+    blocks: List[str] = []
+    prelude: List[str] = []
+    position = 0
+
+    while position < len(css):
+        match = _CSS_TOKEN.match(css, position)
+        position = match.end()
+        token = match.group()
+        if token.startswith("/*"):
+            continue
+        if token == "{":
+            text = "".join(prelude).strip()
+            prelude = []
+            in_rules = not blocks or blocks[-1] == "rules"
+            if text.startswith("@"):
+                name = text[1:].split(None, 1)[0].split("(", 1)[0].lower() if len(text) > 1 else ""
+                blocks.append("rules" if in_rules and name in _GROUPING_AT_RULES else "other")
+            else:
+                if in_rules:
+                    rules += 1
+                    for selector in text.split(","):
+                        selector = selector.strip()
+                        if selector:
+                            selectors.append((selector, *_selector_requirements(selector)))
+                blocks.append("other")
+            if blocks[-1] == "other":
+                # Skip the declarations in one match, up to the block's end or a nested block
+                declarations = _CSS_DECLARATIONS.match(css, position)
+                position = declarations.end()
+                if "url(" in declarations.group():
+                    urls.update(url for url in _CSS_URL.findall(declarations.group()) if _is_fetched(url))
+            continue
+        if token in ";}":
+            text = "".join(prelude).strip()
+            if text.startswith("@import"):
+                imported = _IMPORT_URL.match(text)
+                if imported and _is_fetched(imported.group(1)):
+                    urls.add(imported.group(1))
+            prelude = []
+            if token == "}" and blocks:
+                blocks.pop()
+            continue
+        prelude.append(token)
+
+    return _Stylesheet(rules, tuple(selectors), frozenset(urls))
+
+
+def _scan_css(css: str, page: _Page) -> Dict:
+    """Count rules and selectors, find the selectors page does not use, and add the stylesheet's URLs to it"""
+    sheet = _parse_css(css)
+    page.urls.update(sheet.urls)
+    unused = [
+        selector for selector, classes, ids, tags in sheet.selectors
+        if not (classes <= page.classes and ids <= page.ids and tags <= page.tags)
+    ]
+    return {
+        "rules": sheet.rules,
+        "selectors": len(sheet.selectors),
+        "unused_selector_count": len(unused),
+        "unused_selectors": unused[:_MAX_LISTED_SELECTORS]
+    }
+
+
+def analyze_page(html: str, css: str, js: str, budgets: Optional[Dict[str, int]] = None) -> Dict:
+    """
+    Page weight report for one generated page
+
+    The report's over_budget lists every budget the page exceeds; budgets
+    default to get_budgets().
+    """
+    page = _scan_html(html)
+    page.classes.update(_SCRIPT_CLASS.findall(js))
+    css_stats = _scan_css(css, page)
+
+    sizes = {"html": _sizes(html)}
+    for asset, text in (("css", css), ("js", js)):
+        raw, gzipped = _shared_sizes(text)
+        sizes[asset] = {"raw": raw, "gzip": gzipped}
+    sizes["total"] = {key: sum(size[key] for size in sizes.values()) for key in ("raw", "gzip")}
+    values = {
+        "html_gzip_bytes": sizes["html"]["gzip"],
+        "css_gzip_bytes": sizes["css"]["gzip"],
+        "js_gzip_bytes": sizes["js"]["gzip"],
+        "total_gzip_bytes": sizes["total"]["gzip"],
+        "dom_nodes": page.nodes,
+        "dom_depth": page.max_depth,
+        "css_rules": css_stats["rules"],
+        "unused_selectors": css_stats["unused_selector_count"],
+        "external_requests": len(page.urls)
+    }
+    limits = get_budgets() if budgets is None else budgets
+    over_budget = [
+        {"metric": metric, "value": values[metric], "limit": limit}
+        for metric, limit in limits.items()
+        if values.get(metric, 0) > limit
+    ]
+    return {
+        "bytes": sizes,
+        "dom": {"nodes": page.nodes, "max_depth": page.max_depth},
+        "css": css_stats,
+        "external_requests": len(page.urls),
+        "within_budget": not over_budget,
+        "over_budget": over_budget
+    }
+
+
+def record_page_weight(report: Dict) -> None:
+    """Export a generated page's weight as metrics"""
+    for asset in ("html", "css", "js", "total"):
+        PAGE_BYTES.observe(report["bytes"][asset]["gzip"], asset=asset)
+    for violation in report["over_budget"]:
+        OVER_BUDGET.inc(metric=violation["metric"])
@@ -0,0 +1,255 @@
+"""
+Model providers used by AIService
+
+GeminiProvider talks to Google Gemini. FakeProvider answers locally with
+realistic JSON after a sampled delay, and can inject errors and malformed
+output, so the pipeline can be load-tested and profiled without a key.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import re
+from typing import Callable, NamedTuple, Optional
+
+from .classifier import classify
+from ..templates.heuristic_content import (
+    NAV_ITEMS, CTA_BUTTONS, FEATURES, FEATURE_HEADINGS, GALLERY, CONTACT_SUBTITLES, FOOTER_SECTIONS
+)
+
+
+class ModelResponse(NamedTuple):
+    text: str
+    # Token counts reported by the provider, when it reports them
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+class ModelConfig(NamedTuple):
+    """Model and sampling settings for one stage; None keeps the provider default"""
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+    max_output_tokens: Optional[int] = None
+    timeout_s: Optional[float] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for providers that report no usage, at ~4 characters per token"""
+    return (len(text) + 3) // 4
+
+
+class ProviderError(Exception):
+    """Raised when a provider fails to produce a response"""
+
+
+class ModelProvider:
+    """Interface for text generation backends"""
+
+    name = "base"
+
+    async def generate(self, prompt: str, config: Optional[ModelConfig] = None) -> ModelResponse:
+        raise NotImplementedError
+
+
+class GeminiProvider(ModelProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str], model_name: str = "gemini-pro"):
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.model_name = model_name
+        self._models = {}
+
+    def _model(self, name: str):
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = self._genai.GenerativeModel(name)
+        return model
+
+    async def generate(self, prompt: str, config: Optional[ModelConfig] = None) -> ModelResponse:
+        config = config or ModelConfig()
+        generation_config = {}
+        if config.temperature is not None:
+            generation_config["temperature"] = config.temperature
+        if config.max_output_tokens is not None:
+            generation_config["max_output_tokens"] = config.max_output_tokens
+        response = await self._model(config.model or self.model_name).generate_content_async(
+            prompt,
+            generation_config=generation_config or None
+        )
+        usage = getattr(response, "usage_metadata", None)
+        return ModelResponse(
+            text=response.text,
+            input_tokens=getattr(usage, "prompt_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None)
+        )
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution into a sampler returning seconds
+
+    Supported specs (all values in milliseconds):
+    fixed:MS, uniform:LOW:HIGH, normal:MEAN:STDDEV, lognormal:MEDIAN:SIGMA
+    """
+    kind, *params = spec.split(":")
+    values = [float(param) for param in params]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(rng.gauss(values[0], values[1]), 0.0) / 1000
+    if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+
+_QUOTED = re.compile(r'"([^"\n]*)"')
+_COMPONENT = re.compile(r"content for an? (\w+) component")
+
+
+class FakeProvider(ModelProvider):
+    """Local stand-in for a model with configurable latency and failure rates"""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: str = "lognormal:800:0.4",
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self._rng = random.Random(seed)
+
+    async def generate(self, prompt: str, config: Optional[ModelConfig] = None) -> ModelResponse:
+        await asyncio.sleep(self.sample_latency(self._rng))
+        if self._rng.random() < self.error_rate:
+            raise ProviderError("Injected fake provider error")
+
+        payload = json.dumps(self._payload(prompt))
+        if self._rng.random() < self.malformed_rate:
+            payload = self._malformed(payload)
+        elif self._rng.random() < 0.5:
+            # Real models often wrap JSON in a fenced block
+            payload = f"```json\n{payload}\n```"
+        if config is not None and config.max_output_tokens is not None:
+            # Cut off at the output limit like a real model would
+            payload = payload[: config.max_output_tokens * 4]
+        return ModelResponse(text=payload)
+
+    def _malformed(self, payload: str) -> str:
+        choice = self._rng.randrange(3)
+        if choice == 0:
+            # Truncated mid-object, as when output hits the token limit
+            return payload[: max(len(payload) // 2, 1)]
+        if choice == 1:
+            return "I'm sorry, I can't produce JSON for that request right now."
+        return payload.replace('",', '"', 1)
+
+    def _payload(self, prompt: str) -> dict:
+        quoted = _QUOTED.search(prompt)
+        user_prompt = quoted.group(1) if quoted else prompt
+        traits = classify(user_prompt)
+        website_type = traits.website_type if traits.website_type in NAV_ITEMS else "business"
+        fields = {
+            "role": traits.role,
+            "service": traits.service,
+            "service_title": traits.service.title(),
+            "brand": traits.role.title()
+        }
+
+        if "Analyze this website request" in prompt:
+            components = ["navigation", "hero", "features"]
+            if website_type in ("portfolio", "blog"):
+                components.append("gallery")
+            return {
+                "components": components + ["contact", "footer"],
+                "website_type": website_type,
+                "primary_focus": traits.role
+            }
+        if "meta information" in prompt:
+            return {
+                "title": f"{fields['brand']} | {traits.service.title()}"[:60],
+                "description": f"{fields['brand']} offers {traits.service} for every {traits.role} need."[:160]
+            }
+
+        component = _COMPONENT.search(prompt)
+        component_type = component.group(1) if component else "hero"
+        if component_type == "navigation":
+            return {
+                "brand_name": fields["brand"],
+                "nav_items": "".join(
+                    f'<li><a href="#{anchor}">{label}</a></li>' for anchor, label in NAV_ITEMS[website_type]
+                )
+            }
+        if component_type == "hero":
+            primary, secondary = CTA_BUTTONS[website_type]
+            return {
+                "title": f"{fields['brand']}: {traits.service.title()} Done Right",
+                "subtitle": f"Trusted {traits.service} from an experienced {traits.role}.",
+                "cta_buttons": (
+                    f'<button class="btn btn-primary">{primary}</button>'
+                    f'<button class="btn btn-secondary">{secondary}</button>'
+                )
+            }
+        if component_type == "features":
+            section_title, section_subtitle = FEATURE_HEADINGS[website_type]
+            return {
+                "section_title": section_title,
+                "section_subtitle": section_subtitle,
+                "feature_items": "".join(
+                    f'<div class="feature-card"><div class="feature-icon">{icon}</div>'
+                    f'<h3>{title.format(**fields)}</h3><p>{text.format(**fields)}</p></div>'
+                    for icon, title, text in FEATURES[website_type]
+                )
+            }
+        if component_type == "gallery":
+            section_title, items = GALLERY[website_type]
+            return {
+                "section_title": section_title,
+                "gallery_items": "".join(
+                    f'<div class="gallery-item"><img src="https://via.placeholder.com/400x300" alt="{title}">'
+                    f'<div class="gallery-overlay"><h3>{title}</h3></div></div>'
+                    for title in items
+                )
+            }
+        if component_type == "contact":
+            return {"section_title": "Let's Work Together", "section_subtitle": CONTACT_SUBTITLES[website_type]}
+        return {
+            "brand_name": fields["brand"],
+            "brand_description": f"{traits.service.title()} by a dedicated {traits.role}.",
+            "year": "2026",
+            "footer_sections": "".join(
+                f'<div class="footer-section"><h4>{heading}</h4><ul>'
+                + "".join(f'<li><a href="#">{link}</a></li>' for link in links)
+                + "</ul></div>"
+                for heading, links in FOOTER_SECTIONS[website_type]
+            )
+        }
+
+
+def provider_from_env() -> ModelProvider:
+    """Build the provider selected by MODEL_PROVIDER (gemini or fake)"""
+    name = os.getenv("MODEL_PROVIDER", "gemini")
+    if name == "fake":
+        seed = os.getenv("FAKE_MODEL_SEED")
+        return FakeProvider(
+            latency=os.getenv("FAKE_MODEL_LATENCY", "lognormal:800:0.4"),
+            error_rate=float(os.getenv("FAKE_MODEL_ERROR_RATE", "0")),
+            malformed_rate=float(os.getenv("FAKE_MODEL_MALFORMED_RATE", "0")),
+            seed=int(seed) if seed else None
+        )
+    if name == "gemini":
+        return GeminiProvider(os.getenv("GEMINI_API_KEY"))
+    raise ValueError(f"Unknown MODEL_PROVIDER: {name}")
@@ -0,0 +1,137 @@
+"""
+Shared cache of model responses
+
+Wraps the model provider so a response for the same prompt and settings is
+served from the shared state instead of calling the model again, whichever
+worker produced it. Identical calls in flight at the same time are made only
+once: callers in the same process await the first call, and workers in other
+processes wait for its result to appear in the cache. Served responses report
+zero tokens, since no model tokens were spent on them. Responses the caller
+cannot use (see cacheable) are not stored, so one malformed answer does not
+pin the fallback output for its prompt until the TTL runs out.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Optional
+
+from .metrics import counter, register_cache
+from .providers import ModelConfig, ModelProvider, ModelResponse
+from .shared_state import SharedState, get_shared_state
+
+COALESCED = counter(
+    "model_calls_coalesced_total",
+    "Model calls that waited for an identical call already in flight, by scope (process, shared)",
+    ("scope",)
+)
+
+
+def response_key(provider: str, prompt: str, config: Optional[ModelConfig]) -> str:
+    config = config or ModelConfig()
+    # The timeout does not change the response, so it is not part of the key
+    settings = f"{provider}\n{config.model}\n{config.temperature}\n{config.max_output_tokens}\n"
+    return "response:" + hashlib.sha256((settings + prompt).encode("utf-8")).hexdigest()
+
+
+class CachingProvider(ModelProvider):
+    def __init__(
+        self,
+        inner: ModelProvider,
+        state: SharedState,
+        ttl_s: float,
+        lease_s: float = 30.0,
+        poll_interval: float = 0.05,
+        cacheable: Optional[Callable[[str], bool]] = None
+    ):
+        self.inner = inner
+        # Spans and metrics keep reporting the provider that produced the text
+        self.name = inner.name
+        self.state = state
+        self.ttl_s = ttl_s
+        self.lease_s = lease_s
+        self.poll_interval = poll_interval
+        # Decides from a response's text whether it is worth storing; None stores all
+        self.cacheable = cacheable
+        self.hits = 0
+        self.misses = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        register_cache("model_response", lambda: (self.hits, self.misses))
+
+    async def _lookup(self, key: str) -> Optional[ModelResponse]:
+        cached = await self.state.get(key)
+        if cached is None:
+            return None
+        return ModelResponse(text=json.loads(cached)["text"], input_tokens=0, output_tokens=0)
+
+    async def generate(self, prompt: str, config: Optional[ModelConfig] = None) -> ModelResponse:
+        key = response_key(self.inner.name, prompt, config)
+        cached = await self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        leader = self._in_flight.get(key)
+        if leader is not None:
+            COALESCED.inc(scope="process")
+            text = await asyncio.shield(leader)
+            if text is None:
+                # The first call was cancelled; make our own
+                return await self.generate(prompt, config)
+            self.hits += 1
+            return ModelResponse(text=text, input_tokens=0, output_tokens=0)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await self._generate_once(key, prompt, config)
+            future.set_result(response.text)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not log a warning
+            future.exception()
+            raise
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _generate_once(self, key: str, prompt: str, config: Optional[ModelConfig]) -> ModelResponse:
+        """Call the model unless another worker holds the lease for this key and delivers first"""
+        lease = key.replace("response:", "lease:", 1)
+        if not await self.state.add(lease, "1", self.lease_s):
+            COALESCED.inc(scope="shared")
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                cached = await self._lookup(key)
+                if cached is not None:
+                    self.hits += 1
+                    return cached
+                # Taking over the lease means the other worker failed or gave up
+                if await self.state.add(lease, "1", self.lease_s):
+                    break
+
+        self.misses += 1
+        try:
+            response = await self.inner.generate(prompt, config)
+            if self.cacheable is None or self.cacheable(response.text):
+                await self.state.set(key, json.dumps({"text": response.text}), self.ttl_s)
+            return response
+        finally:
+            await self.state.delete(lease)
+
+
+def wrap_with_cache(provider: ModelProvider, cacheable: Optional[Callable[[str], bool]] = None) -> ModelProvider:
+    """Apply MODEL_CACHE_TTL_S to the configured provider; 0 (the default) leaves it uncached"""
+    ttl_s = float(os.getenv("MODEL_CACHE_TTL_S", "0"))
+    if ttl_s <= 0:
+        return provider
+    return CachingProvider(
+        provider,
+        get_shared_state(),
+        ttl_s,
+        lease_s=float(os.getenv("MODEL_CACHE_LEASE_S", "30")),
+        cacheable=cacheable
+    )
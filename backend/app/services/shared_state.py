@@ -0,0 +1,248 @@
+"""
+State shared by all API workers on a host
+
+Caches, rate-limit buckets and in-flight markers kept in process memory are
+split across uvicorn workers: each worker misses on what another one cached
+and grants its own burst of requests. SharedState is the small interface
+those features use instead, so every worker sees the same entries.
+
+SqliteState keeps them in a SQLite database in WAL mode, which any number of
+processes on the host can read and write concurrently. MemoryState keeps them
+in the process, for single-worker setups and benchmarks. A networked store
+(Redis, memcached) can be added by implementing the same methods.
+"""
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Upper bound on distinct client buckets kept in memory
+_MAX_BUCKETS = 10000
+# Expired rows are purged after this many writes
+_PURGE_EVERY = 512
+
+
+def refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, tokens + max(now - updated, 0.0) * rate)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Take a token; return 0 on success or seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = refill(self.tokens, self.updated, now, self.rate, self.burst)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class SharedState:
+    """Key/value entries with expiry, set-if-absent leases and token buckets"""
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, ttl_s: float) -> None:
+        raise NotImplementedError
+
+    async def add(self, key: str, value: str, ttl_s: float) -> bool:
+        """Set key only if it is absent or expired; return whether it was set"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def take_token(self, key: str, rate: float, burst: float) -> float:
+        """Take a token from key's bucket; return 0 on success or seconds until one is available"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryState(SharedState):
+    """Per-process state; what every worker had before there was a shared store"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._writes = 0
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    def _put(self, key: str, value: str, ttl_s: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl_s)
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0:
+            now = time.monotonic()
+            for stale in [k for k, (_, expires) in self._entries.items() if expires <= now]:
+                del self._entries[stale]
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._live(key)
+
+    async def set(self, key: str, value: str, ttl_s: float) -> None:
+        self._put(key, value, ttl_s)
+
+    async def add(self, key: str, value: str, ttl_s: float) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._put(key, value, ttl_s)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def take_token(self, key: str, rate: float, burst: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+            if len(self._buckets) > _MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.try_acquire()
+
+
+class SqliteState(SharedState):
+    """
+    State in a SQLite database in WAL mode, shared by every process that opens the same file
+
+    Each operation is one short transaction run on a worker thread, so a
+    writer in another process never blocks the event loop.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _read(self, operation, *args):
+        with self._lock:
+            return operation(self._connect(), *args)
+
+    def _run(self, operation, *args):
+        """Run a read-modify-write operation holding the database write lock"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(conn, *args)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def _after_write(self, conn: sqlite3.Connection) -> None:
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0:
+            now = time.time()
+            conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+            # A bucket idle for a minute is refilled, or close to it, for any sane rate
+            conn.execute("DELETE FROM buckets WHERE updated <= ?", (now - 60,))
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM entries WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def _set(self, conn: sqlite3.Connection, key: str, value: str, ttl_s: float) -> None:
+        conn.execute("INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                     (key, value, time.time() + ttl_s))
+        self._after_write(conn)
+
+    def _add(self, conn: sqlite3.Connection, key: str, value: str, ttl_s: float) -> bool:
+        if self._get(conn, key) is not None:
+            return False
+        self._set(conn, key, value, ttl_s)
+        return True
+
+    def _take_token(self, conn: sqlite3.Connection, key: str, rate: float, burst: float) -> float:
+        now = time.time()
+        row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+        tokens = refill(row[0], row[1], now, rate, burst) if row else burst
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+        self._after_write(conn)
+        return wait
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._read, self._get, key)
+
+    async def set(self, key: str, value: str, ttl_s: float) -> None:
+        await asyncio.to_thread(self._run, self._set, key, value, ttl_s)
+
+    async def add(self, key: str, value: str, ttl_s: float) -> bool:
+        return await asyncio.to_thread(self._run, self._add, key, value, ttl_s)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._run, lambda conn: conn.execute("DELETE FROM entries WHERE key = ?", (key,)))
+
+    async def take_token(self, key: str, rate: float, burst: float) -> float:
+        return await asyncio.to_thread(self._run, self._take_token, key, rate, burst)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def state_from_env() -> SharedState:
+    backend = os.getenv("SHARED_STATE", "sqlite")
+    if backend == "memory":
+        return MemoryState()
+    if backend == "sqlite":
+        default_path = os.path.join(tempfile.gettempdir(), "ai-website-generator-state.db")
+        return SqliteState(os.getenv("SHARED_STATE_PATH") or default_path)
+    raise ValueError(f"Invalid shared state backend: {backend}")
+
+
+@lru_cache(maxsize=None)
+def get_shared_state() -> SharedState:
+    """Build the shared state on first use, after the environment is loaded"""
+    return state_from_env()
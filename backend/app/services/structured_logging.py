@@ -0,0 +1,151 @@
+"""
+Structured, non-blocking logging
+
+Records from the "app" logger tree are handed to a queue and written as one
+JSON object per line by a background listener thread, so logging never does
+I/O on the event loop. Every record carries the current request ID and
+trace ID. Fallback warnings, which can fire on every request while the model
+misbehaves, are sampled per (event, stage, reason).
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from .tracing import current_span
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes passed through extra= that are copied into the JSON output
+_FIELDS = ("stage", "component", "reason", "error", "sample", "job_id", "suppressed")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def truncate(text: Optional[str], limit: int = 200) -> Optional[str]:
+    """Shorten a model response for logging"""
+    if text is None or len(text) <= limit:
+        return text
+    return text[:limit] + f"... ({len(text)} chars)"
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the request and trace they belong to"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        span = current_span()
+        record.trace_id = span.trace.trace_id if span is not None else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Let through at most burst records per key and window for records that
+    carry a fallback reason; the next record let through reports how many
+    were suppressed in between
+    """
+
+    def __init__(self, burst: int = 10, window: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._lock = threading.Lock()
+        self._windows: Dict[Tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        reason = getattr(record, "reason", None)
+        if reason is None or self.burst <= 0:
+            return True
+        key = (record.name, record.msg, getattr(record, "stage", None), reason)
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                state = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if state[1] >= self.burst:
+                state[2] += 1
+                return False
+            state[1] += 1
+            return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "trace_id": getattr(record, "trace_id", None)
+        }
+        for field in _FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records without formatting them
+
+    The stock QueueHandler renders the message and traceback in the calling
+    thread; here only the message arguments are merged and everything else,
+    including the traceback, is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging() -> None:
+    """Route the "app" loggers through a queue to a background writer"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "json") == "text":
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    else:
+        stream.setFormatter(JsonFormatter())
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    handler = _DeferredQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(
+        burst=int(os.getenv("LOG_SAMPLE_BURST", "10")),
+        window=float(os.getenv("LOG_SAMPLE_WINDOW_S", "60"))
+    ))
+    handler.addFilter(ContextFilter())
+
+    logger = logging.getLogger("app")
+    logger.handlers = [handler]
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,55 @@
+"""
+Re-theming of assembled stylesheets
+
+A color scheme only contributes the :root variables block of the stylesheet
+built by AIService._assemble_css; everything else refers to the variables.
+Switching schemes therefore means swapping that one block, which needs no
+model call and no re-assembly of the component CSS.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from ..templates.color_schemes import COLOR_SCHEMES
+
+_ROOT_OPEN = ":root {"
+
+
+class ThemeError(ValueError):
+    """Raised when a stylesheet or scheme cannot be re-themed"""
+
+
+# Same layout as the block _assemble_css writes
+_ROOT_BLOCKS = {
+    scheme_id: f":root {{\n{scheme['variables']}\n}}"
+    for scheme_id, scheme in COLOR_SCHEMES.items()
+}
+
+
+def _split(css: str) -> Tuple[str, str]:
+    """Return the stylesheet before and after its first :root block"""
+    start = css.find(_ROOT_OPEN)
+    end = css.find("}", start) if start != -1 else -1
+    if end == -1:
+        raise ThemeError("Stylesheet has no :root variables block")
+    return css[:start], css[end + 1:]
+
+
+def check_color_schemes(color_schemes: Iterable[Optional[str]]) -> None:
+    """Raise ThemeError naming any scheme that is not in COLOR_SCHEMES; None keeps the default"""
+    unknown = [scheme for scheme in color_schemes if scheme is not None and scheme not in COLOR_SCHEMES]
+    if unknown:
+        raise ThemeError(f"Unknown color scheme: {', '.join(unknown)}")
+
+
+def retheme_css(css: str, color_scheme: str) -> str:
+    """Return css with its :root variables replaced by those of color_scheme"""
+    block = _ROOT_BLOCKS.get(color_scheme)
+    if block is None:
+        raise ThemeError(f"Unknown color scheme: {color_scheme}")
+    head, tail = _split(css)
+    return head + block + tail
+
+
+def retheme_all(css: str) -> Dict[str, str]:
+    """Return css re-themed to every available color scheme, keyed by scheme"""
+    head, tail = _split(css)
+    return {scheme_id: head + block + tail for scheme_id, block in _ROOT_BLOCKS.items()}
@@ -0,0 +1,301 @@
+"""
+Lightweight per-request tracing
+
+Spans are kept in memory for the lifetime of a trace, which lets the HTTP
+middleware summarize them in a Server-Timing header. Finished traces can be
+exported in the OpenTelemetry (OTLP/JSON) format to a collector or to a
+file; export happens on a background thread so it never blocks a request.
+"""
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+SPANS_DROPPED = counter(
+    "trace_spans_dropped_total",
+    "Spans discarded because the export queue was full or the exporter failed"
+)
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    __slots__ = (
+        "name", "trace", "span_id", "parent_id", "kind", "timing", "attributes",
+        "start_unix_ns", "_start_ns", "duration_ns", "status", "status_message"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace: "Trace",
+        parent_id: str,
+        kind: int,
+        timing: Optional[str],
+        attributes: Dict
+    ):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.timing = timing
+        self.attributes = attributes
+        self.start_unix_ns = time.time_ns()
+        self._start_ns = time.perf_counter_ns()
+        self.duration_ns: Optional[int] = None
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def end(self) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._start_ns
+
+    def to_otlp(self) -> Dict:
+        end_ns = self.start_unix_ns + (self.duration_ns or 0)
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_unix_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message} if self.status else {}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Trace:
+    """All spans of one request or background job"""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.spans: List[Span] = []
+
+    def server_timing(self) -> str:
+        """Sum finished spans by their timing name into a Server-Timing header value"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            if span.timing and span.duration_ns is not None:
+                totals[span.timing] = totals.get(span.timing, 0.0) + span.duration_ns / 1e6
+        entries = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+        entries.append(f'trace;desc="{self.trace_id}"')
+        return ", ".join(entries)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(
+    name: str,
+    timing: Optional[str] = None,
+    kind: int = KIND_INTERNAL,
+    parent: Optional[Tuple[str, str]] = None,
+    **attributes
+) -> Iterator[Span]:
+    """
+    Record a span around a block, nested under the current span
+
+    Without a current span a new trace is started, continuing the remote
+    (trace_id, span_id) parent if one is given. timing names the entry the
+    span contributes to the Server-Timing header. Asyncio tasks inherit the
+    span that was current when they were created.
+    """
+    current = _current_span.get()
+    if current is not None:
+        trace = current.trace
+        parent_id = current.span_id
+    elif parent is not None:
+        trace = Trace(parent[0])
+        parent_id = parent[1]
+    else:
+        trace = Trace()
+        parent_id = ""
+    new_span = Span(name, trace, parent_id, kind, timing, attributes)
+    trace.spans.append(new_span)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.set_error(str(e) or type(e).__name__)
+        raise
+    finally:
+        new_span.end()
+        _current_span.reset(token)
+        if current is None:
+            get_exporter().export(trace)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Read (trace_id, parent_span_id) from a W3C traceparent header"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2]
+
+
+def _otlp_attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class TraceExporter:
+    """
+    Batches finished traces on a background thread and writes them as OTLP/JSON
+
+    target is "otlp" (POST to {endpoint}/v1/traces), "file" (one JSON
+    payload per line appended to path) or "" to keep traces in-process only.
+    """
+
+    def __init__(
+        self,
+        target: str = "",
+        endpoint: str = "http://localhost:4318",
+        path: str = "traces.jsonl",
+        service_name: str = "ai-website-generator",
+        max_queue: int = 2048,
+        batch_size: int = 64,
+        interval: float = 2.0
+    ):
+        if target not in ("", "otlp", "file"):
+            raise ValueError(f"Invalid trace exporter: {target}")
+        self.target = target
+        self.endpoint = endpoint.rstrip("/") + "/v1/traces"
+        self.path = path
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TraceExporter":
+        return cls(
+            target=os.getenv("TRACE_EXPORTER", ""),
+            endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318"),
+            path=os.getenv("TRACE_FILE", "traces.jsonl"),
+            service_name=os.getenv("OTEL_SERVICE_NAME", "ai-website-generator")
+        )
+
+    def export(self, trace: Trace) -> None:
+        if not self.target:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            SPANS_DROPPED.inc(len(trace.spans))
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Flush queued traces and stop the export thread"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Trace] = []
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    trace = self._queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if trace is None:
+                    stopping = True
+                    break
+                batch.append(trace)
+            if batch:
+                self._write(batch)
+
+    def _payload(self, batch: List[Trace]) -> Dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "app"},
+                    "spans": [span.to_otlp() for trace in batch for span in trace.spans]
+                }]
+            }]
+        }
+
+    def _write(self, batch: List[Trace]) -> None:
+        body = json.dumps(self._payload(batch))
+        try:
+            if self.target == "file":
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(body + "\n")
+            else:
+                request = urllib.request.Request(
+                    self.endpoint,
+                    data=body.encode("utf-8"),
+                    headers={"Content-Type": "application/json"},
+                    method="POST"
+                )
+                with urllib.request.urlopen(request, timeout=10):
+                    pass
+        except Exception as e:
+            logger.warning("Trace export failed: %s", e)
+            SPANS_DROPPED.inc(sum(len(trace.spans) for trace in batch))
+
+
+@lru_cache(maxsize=None)
+def get_exporter() -> TraceExporter:
+    """Build the exporter on first use, after the environment is loaded"""
+    return TraceExporter.from_env()
@@ -532,6 +532,39 @@ COMPONENTS = {
     }
 }
 
+# What the model should write into each template slot. Slots without an
+# entry (such as hero_image) are not requested from the model.
+COMPONENT_FIELDS = {
+    "navigation": {
+        "brand_name": "short brand or site name",
+        "nav_items": "4-5 HTML <li><a href=\"#section\">Label</a></li> items",
+    },
+    "hero": {
+        "title": "headline, under 10 words",
+        "subtitle": "one supporting sentence",
+        "cta_buttons": "two HTML buttons with classes \"btn btn-primary\" and \"btn btn-secondary\"",
+    },
+    "features": {
+        "section_title": "section heading",
+        "section_subtitle": "one-line section intro",
+        "feature_items": "3 HTML <div class=\"feature-card\"> blocks, each with <div class=\"feature-icon\">, <h3> and <p>",
+    },
+    "gallery": {
+        "section_title": "section heading",
+        "gallery_items": "4-6 HTML <div class=\"gallery-item\"> blocks, each with an <img> and <div class=\"gallery-overlay\"><h3>",
+    },
+    "contact": {
+        "section_title": "section heading",
+        "section_subtitle": "one-line invitation to get in touch",
+    },
+    "footer": {
+        "brand_name": "short brand or site name",
+        "brand_description": "one-sentence description",
+        "year": "current year",
+        "footer_sections": "2-3 HTML <div class=\"footer-section\"> blocks, each with <h4> and a <ul> of links",
+    },
+}
+
 # JavaScript utilities for all components
 COMMON_JS = """
 // Mobile navigation toggle
@@ -0,0 +1,89 @@
+"""
+Content packs for the heuristic (no AI) generation path, keyed by website type
+Text may use {role}, {service} and {brand} placeholders, filled from the prompt
+"""
+
+NAV_ITEMS = {
+    "portfolio": [("home", "Home"), ("work", "Work"), ("about", "About"), ("contact", "Contact")],
+    "blog": [("home", "Home"), ("articles", "Articles"), ("about", "About"), ("contact", "Contact")],
+    "ecommerce": [("home", "Home"), ("shop", "Shop"), ("collections", "Collections"), ("contact", "Contact")],
+    "landing": [("home", "Home"), ("features", "Features"), ("pricing", "Pricing"), ("contact", "Sign Up")],
+    "business": [("home", "Home"), ("about", "About"), ("services", "Services"), ("contact", "Contact")],
+}
+
+CTA_BUTTONS = {
+    "portfolio": ("View My Work", "Get In Touch"),
+    "blog": ("Start Reading", "Subscribe"),
+    "ecommerce": ("Shop Now", "Browse Collections"),
+    "landing": ("Get Started Free", "See How It Works"),
+    "business": ("Get Started", "Learn More"),
+}
+
+FEATURES = {
+    "portfolio": [
+        ("&#127912;", "Selected Work", "A curated selection of recent {role} projects"),
+        ("&#128161;", "Thoughtful Process", "Every project starts with listening and ends with craft"),
+        ("&#129309;", "Collaboration", "Working closely with clients from brief to delivery"),
+    ],
+    "blog": [
+        ("&#128214;", "In-Depth Articles", "Long-form writing on {service} from a {role}"),
+        ("&#128172;", "Honest Opinions", "Real experiences, lessons learned and practical tips"),
+        ("&#128231;", "Fresh Every Week", "New stories delivered straight to your inbox"),
+    ],
+    "ecommerce": [
+        ("&#128717;", "Curated Products", "Hand-picked items for every {role} customer"),
+        ("&#128666;", "Fast Shipping", "Orders packed and shipped within two business days"),
+        ("&#128260;", "Easy Returns", "Not quite right? Return it within 30 days"),
+    ],
+    "landing": [
+        ("&#9889;", "Instant Setup", "Get up and running with {brand} in minutes"),
+        ("&#128200;", "Built to Scale", "Grows with your team from the first user to the thousandth"),
+        ("&#128274;", "Secure by Default", "Your data is encrypted and protected at every step"),
+    ],
+    "business": [
+        ("&#127919;", "Expert {service_title}", "Experienced {role} services tailored to your goals"),
+        ("&#9201;", "On Time, Every Time", "Clear timelines and reliable delivery you can plan around"),
+        ("&#11088;", "Trusted by Clients", "Long-term relationships built on quality work"),
+    ],
+}
+
+FEATURE_HEADINGS = {
+    "portfolio": ("What I Do", "Skills and services behind every project"),
+    "blog": ("Highlights", "What you'll find here"),
+    "ecommerce": ("Why Shop With Us", "Quality products and service you can count on"),
+    "landing": ("Key Features", "Everything you need, nothing you don't"),
+    "business": ("Our Services", "What makes us unique"),
+}
+
+GALLERY = {
+    "portfolio": ("Portfolio", ["Featured Project", "Client Commission", "Personal Study"]),
+    "blog": ("Recent Posts", ["Latest Story", "Behind the Scenes", "Reader Favourite"]),
+    "ecommerce": ("Best Sellers", ["New Arrival", "Customer Favourite", "Limited Edition"]),
+    "landing": ("See It In Action", ["Dashboard", "Reports", "Integrations"]),
+    "business": ("Our Work", ["Case Study", "Recent Project", "Client Success"]),
+}
+
+GALLERY_COLORS = ["667eea", "764ba2", "f093fb"]
+
+CONTACT_SUBTITLES = {
+    "portfolio": "Have a project in mind? Let's talk about it",
+    "blog": "Questions or collaboration ideas?",
+    "ecommerce": "Questions about an order or a product? We're here to help",
+    "landing": "Tell us about your team and we'll get you set up",
+    "business": "Work with us on your next project",
+}
+
+FOOTER_SECTIONS = {
+    "portfolio": [("Explore", ["Work", "About", "Contact"]), ("Connect", ["Instagram", "LinkedIn", "Email"])],
+    "blog": [("Read", ["Latest", "Popular", "Archive"]), ("Follow", ["Newsletter", "RSS", "Instagram"])],
+    "ecommerce": [("Shop", ["New Arrivals", "Best Sellers", "Gift Cards"]), ("Help", ["Shipping", "Returns", "Contact"])],
+    "landing": [("Product", ["Features", "Pricing", "Changelog"]), ("Company", ["About", "Careers", "Contact"])],
+    "business": [("Company", ["About Us", "Services", "Careers"]), ("Support", ["Contact", "FAQ", "Privacy"])],
+}
+
+# Words skipped when deriving a brand name from the start of a prompt
+BRAND_STOPWORDS = {
+    "a", "an", "the", "create", "build", "make", "design", "generate", "i", "we", "want", "need",
+    "please", "website", "site", "web", "page", "for", "my", "our", "me", "us", "modern", "simple",
+    "new", "professional", "personal", "landing", "portfolio", "blog", "online", "store", "shop",
+}
@@ -0,0 +1,82 @@
+"""
+Standalone generation workers
+
+Runs the job worker pool against the configured MongoDB without the HTTP
+API, for deployments whose API processes run no workers of their own
+(serverless mode, or GENERATION_WORKERS=0):
+
+    python -m app.worker --workers 4
+
+Set GENERATION_EXTERNAL_WORKERS=1 on the API so POST /api/generate/jobs
+accepts jobs for these workers instead of answering 503. Workers stop on
+SIGINT or SIGTERM; a job they were running is picked up again by another
+worker once its lease expires.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import sys
+from typing import List, Optional
+
+from .env import load_environment
+from .models.database import Database
+from .services.ai_service import AIService
+from .services.jobs import build_pool
+from .services.shared_state import get_shared_state
+from .services.structured_logging import configure_logging, shutdown_logging
+from .services.tracing import get_exporter
+
+
+async def serve(db, workers: int, stop: asyncio.Event) -> None:
+    """Run workers on db until stop is set"""
+    ai_service = AIService()
+    pool = build_pool(db, lambda: ai_service, workers)
+    pool.start()
+    try:
+        await stop.wait()
+    finally:
+        await pool.stop()
+
+
+async def run(workers: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        await serve(Database.get_database(), workers, stop)
+    finally:
+        await Database.close_connection(force=True)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.worker", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--workers", type=int,
+        help="Jobs run at the same time (default GENERATION_WORKERS, or 2 if that is unset or 0)"
+    )
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    load_environment()
+    configure_logging()
+    workers = args.workers or int(os.getenv("GENERATION_WORKERS") or "0") or 2
+    try:
+        asyncio.run(run(workers))
+    finally:
+        get_shared_state().close()
+        get_exporter().shutdown()
+        shutdown_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Shared inputs for benchmarks: user prompts and sample model responses
+"""
+
+PROMPTS = [
+    "Create a modern portfolio website for a wedding photographer",
+    "A blog for a travel writer who covers South America",
+    "Landing page for a SaaS startup selling invoicing software",
+    "Online store for a small coffee roastery",
+    "Website for a family restaurant with a seasonal menu",
+    "Portfolio for a freelance mobile developer",
+    "Personal site for a software engineer looking for backend roles",
+    "An ecommerce shop called Green Leaf selling indoor plants",
+    "Journal of a food writer with recipes and long-form articles",
+    "Launch page for a fitness app with an early access signup",
+    "Business website for an accounting firm in Chicago",
+    "Designer portfolio showing branding and packaging work",
+    "Cafe and bistro website with opening hours and reservations",
+    "Products page for handmade leather goods",
+    "Website for a dental clinic offering family care",
+    "A photography studio specializing in newborn and family portraits",
+    "Blog about personal finance written by a former banker",
+    "Startup landing page for an AI note-taking tool",
+    "Full stack developer portfolio with open source projects",
+    "Site for a yoga teacher offering online classes",
+]
+
+_HERO_JSON = (
+    '{"title": "Capturing Moments That Last Forever", '
+    '"subtitle": "Wedding and portrait photography with a documentary eye", '
+    '"cta_buttons": "<button class=\\"btn btn-primary\\">View Portfolio</button>'
+    '<button class=\\"btn btn-secondary\\">Book a Session</button>"}'
+)
+
+MODEL_RESPONSES = {
+    "clean": _HERO_JSON,
+    "fenced": "Here is the content you asked for:\n```json\n" + _HERO_JSON + "\n```\nLet me know if you need changes.",
+    "malformed": "```json\n" + _HERO_JSON.replace('",', '"', 1)[: len(_HERO_JSON) - 40] + "\n```",
+}
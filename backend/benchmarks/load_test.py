@@ -0,0 +1,270 @@
+"""
+End-to-end load test for the API
+
+Drives a weighted mix of /api/generate, project CRUD and listing at a fixed
+concurrency and reports throughput plus p50/p95/p99 latency per endpoint.
+
+By default the app runs in-process against the fake model provider and an
+in-memory database, so only our own code is measured:
+
+    python -m benchmarks.load_test --concurrency 32 --duration 30 --output results.json
+
+Use --server uvicorn to put a real HTTP server in between, or --url to load
+an already running deployment.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from .corpus import PROMPTS
+
+DEFAULT_MIX = "generate=2,create_project=1,get_project=3,list_projects=2,update_project=1,delete_project=1"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], seed: int):
+        self.client = client
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.rng = random.Random(seed)
+        self.project_ids: List[str] = []
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self.operations}
+        self.statuses: Dict[str, Dict[str, int]] = {name: {} for name in self.operations}
+
+    def _project_body(self, prompt: str) -> Dict:
+        return {
+            "name": prompt[:40],
+            "prompt": prompt,
+            "html": "<!DOCTYPE html><html><body>" + "<section>content</section>" * 400 + "</body></html>",
+            "css": "body { margin: 0; }\n" * 200,
+            "js": "document.addEventListener('DOMContentLoaded', () => {});",
+            "components": [],
+            "meta_description": prompt,
+            "title": prompt[:60],
+            "style": "modern",
+            "color_scheme": "default"
+        }
+
+    async def _request(self, operation: str) -> Optional[httpx.Response]:
+        prompt = self.rng.choice(PROMPTS)
+        if operation in ("get_project", "update_project", "delete_project") and not self.project_ids:
+            operation = "create_project"
+        if operation == "generate":
+            return await self.client.post("/api/generate", json={"prompt": prompt})
+        if operation == "create_project":
+            response = await self.client.post("/api/projects", json=self._project_body(prompt))
+            if response.status_code == 200:
+                self.project_ids.append(response.json()["id"])
+            return response
+        if operation == "list_projects":
+            return await self.client.get("/api/projects")
+        project_id = self.rng.choice(self.project_ids)
+        if operation == "get_project":
+            return await self.client.get(f"/api/projects/{project_id}")
+        if operation == "update_project":
+            return await self.client.put(f"/api/projects/{project_id}", json=self._project_body(prompt))
+        self.project_ids.remove(project_id)
+        return await self.client.delete(f"/api/projects/{project_id}")
+
+    async def _worker(self, stop_at: float, remaining: List[int]) -> None:
+        while time.perf_counter() < stop_at and remaining[0] != 0:
+            remaining[0] -= 1
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self._request(operation)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            self.latencies[operation].append(time.perf_counter() - start)
+            counts = self.statuses[operation]
+            counts[status] = counts.get(status, 0) + 1
+
+    async def run(self, concurrency: int, duration: float, requests: int) -> Dict:
+        remaining = [requests if requests > 0 else -1]
+        start = time.perf_counter()
+        stop_at = start + duration if duration > 0 else float("inf")
+        await asyncio.gather(*(self._worker(stop_at, remaining) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        endpoints = {}
+        total = 0
+        for operation, values in self.latencies.items():
+            if not values:
+                continue
+            values.sort()
+            total += len(values)
+            endpoints[operation] = {
+                "requests": len(values),
+                "throughput_rps": len(values) / elapsed,
+                "mean_ms": sum(values) / len(values) * 1000,
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p95_ms": percentile(values, 0.95) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+                "max_ms": values[-1] * 1000,
+                "statuses": self.statuses[operation]
+            }
+        return {
+            "elapsed_s": elapsed,
+            "requests": total,
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "endpoints": endpoints
+        }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_app(args: argparse.Namespace):
+    """Configure the in-process app with the fake provider and in-memory database"""
+    os.environ.setdefault("GENERATION_WORKERS", "0")
+    # Fallback warnings would interleave with the report on stdout
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("GENERATE_MAX_CONCURRENCY", str(args.concurrency))
+    os.environ.setdefault("GENERATE_MAX_QUEUE", str(args.concurrency * 4))
+
+    from app.main import app
+    from app.models.database import Database
+    from app.routes import generate
+    from app.services.ai_service import AIService
+    from app.services.providers import FakeProvider
+    from .memory_db import MemoryDatabase
+
+    memory_db = MemoryDatabase()
+    Database.get_database = classmethod(lambda cls: memory_db)
+    generate._ai_service = AIService(provider=FakeProvider(
+        latency=args.model_latency,
+        error_rate=args.model_error_rate,
+        malformed_rate=args.model_malformed_rate,
+        seed=args.seed
+    ))
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    server = server_task = None
+    if args.url:
+        base_url = args.url
+        transport = None
+    else:
+        app = prepare_app(args)
+        if args.server == "uvicorn":
+            import uvicorn
+
+            port = free_port()
+            server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+            server_task = asyncio.create_task(server.serve())
+            while not server.started:
+                await asyncio.sleep(0.05)
+            base_url = f"http://127.0.0.1:{port}"
+            transport = None
+        else:
+            base_url = "http://loadtest"
+            transport = httpx.ASGITransport(app=app)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=base_url, transport=transport, limits=limits, timeout=args.timeout
+        ) as client:
+            load_test = LoadTest(client, parse_mix(args.mix), args.seed)
+            results = await load_test.run(args.concurrency, args.duration, args.requests)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await server_task
+
+    results["config"] = {
+        "target": args.url or args.server,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "requests": args.requests,
+        "mix": args.mix,
+        "model_latency": args.model_latency,
+        "model_error_rate": args.model_error_rate,
+        "model_malformed_rate": args.model_malformed_rate,
+        "seed": args.seed
+    }
+    results["commit"] = git_commit()
+    results["timestamp"] = datetime.utcnow().isoformat()
+    return results
+
+
+def print_report(results: Dict) -> None:
+    print(f"{results['requests']} requests in {results['elapsed_s']:.1f}s "
+          f"({results['throughput_rps']:.1f} req/s)")
+    print(f"{'endpoint':<16}{'reqs':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    for name, stats in results["endpoints"].items():
+        print(f"{name:<16}{stats['requests']:>7}{stats['throughput_rps']:>9.1f}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}  {stats['statuses']}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Load an already running server instead of the in-process app")
+    parser.add_argument("--server", choices=("asgi", "uvicorn"), default="asgi",
+                        help="Run the in-process app directly over ASGI or behind uvicorn")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run, 0 for no limit")
+    parser.add_argument("--requests", type=int, default=0, help="Total requests to send, 0 for no limit")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, e.g. generate=2,list_projects=1")
+    parser.add_argument("--model-latency", default="lognormal:800:0.4", help="Fake provider latency distribution")
+    parser.add_argument("--model-error-rate", type=float, default=0.0)
+    parser.add_argument("--model-malformed-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.duration <= 0 and args.requests <= 0:
+        parser.error("set --duration or --requests")
+    return args
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+    print_report(report)
+    if arguments.output:
+        arguments.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {arguments.output}", file=sys.stderr)
@@ -0,0 +1,146 @@
+"""
+In-memory stand-in for the parts of the Motor API the routes use
+
+Supports equality filters, $set/$push updates (dotted paths included),
+sorting and async cursors, which is enough for project CRUD and listing
+under load tests.
+"""
+import copy
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id: ObjectId):
+        self.inserted_id = inserted_id
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+
+
+class DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+
+_MISSING = object()
+
+
+def _get_path(document: Any, path: str) -> Any:
+    for part in path.split("."):
+        if isinstance(document, list) and part.isdigit() and int(part) < len(document):
+            document = document[int(part)]
+        elif isinstance(document, dict) and part in document:
+            document = document[part]
+        else:
+            return _MISSING
+    return document
+
+
+def _set_path(document: Dict, path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        document = document[int(part)] if isinstance(document, list) else document.setdefault(part, {})
+    if isinstance(document, list):
+        document[int(last)] = value
+    else:
+        document[last] = value
+
+
+def _matches(document: Dict, query: Dict) -> bool:
+    return all(_get_path(document, key) == value for key, value in query.items())
+
+
+class MemoryCursor:
+    def __init__(self, documents: List[Dict]):
+        self._documents = documents
+
+    def sort(self, key: str, direction: int = 1) -> "MemoryCursor":
+        self._documents.sort(key=lambda document: document.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self._documents:
+            yield document
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict]:
+        return self._documents[:length] if length else list(self._documents)
+
+
+class MemoryCollection:
+    def __init__(self):
+        self._documents: Dict[ObjectId, Dict] = {}
+
+    async def create_index(self, *args: Any, **kwargs: Any) -> str:
+        return "memory"
+
+    async def insert_one(self, document: Dict) -> InsertOneResult:
+        document_id = document.get("_id") or ObjectId()
+        stored = copy.deepcopy(document)
+        stored["_id"] = document_id
+        self._documents[document_id] = stored
+        return InsertOneResult(document_id)
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> MemoryCursor:
+        query = query or {}
+        return MemoryCursor([
+            copy.deepcopy(document)
+            for document in self._documents.values()
+            if _matches(document, query)
+        ])
+
+    async def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> Optional[Dict]:
+        query = query or {}
+        if set(query) == {"_id"}:
+            document = self._documents.get(query["_id"])
+            return copy.deepcopy(document) if document else None
+        for document in self._documents.values():
+            if _matches(document, query):
+                return copy.deepcopy(document)
+        return None
+
+    async def update_one(self, query: Dict, update: Dict) -> UpdateResult:
+        for document in self._documents.values():
+            if not _matches(document, query):
+                continue
+            for key, value in update.get("$set", {}).items():
+                _set_path(document, key, copy.deepcopy(value))
+            for key, value in update.get("$push", {}).items():
+                document.setdefault(key, []).append(copy.deepcopy(value))
+            return UpdateResult(1, 1)
+        return UpdateResult(0, 0)
+
+    async def delete_one(self, query: Dict) -> DeleteResult:
+        for document_id, document in list(self._documents.items()):
+            if _matches(document, query):
+                del self._documents[document_id]
+                return DeleteResult(1)
+        return DeleteResult(0)
+
+
+class MemoryDatabase:
+    def __init__(self, name: str = "website_generator"):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection()
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
@@ -0,0 +1,170 @@
+"""
+Microbenchmarks for the CPU work around every model call
+
+Covers template filling, HTML/CSS assembly, JSON extraction from model
+responses and the prompt heuristics. Each benchmark reports time per
+operation and memory allocated per operation:
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter assemble --output micro.json
+
+CPython does not expose an allocation counter, so allocations are reported
+as the bytes traced by tracemalloc during one operation (peak above the
+starting point) and the number of memory blocks still held afterwards.
+"""
+import argparse
+import gc
+import itertools
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.services.ai_service import AIService
+from app.services.classifier import classify, get_classifier
+from app.templates.color_schemes import COLOR_SCHEMES
+from app.templates.components import COMPONENTS
+
+from .corpus import MODEL_RESPONSES, PROMPTS
+from .load_test import git_commit
+
+
+def retained_blocks(fn: Callable[[], object]) -> int:
+    before = sys.getallocatedblocks()
+    fn()
+    return sys.getallocatedblocks() - before
+
+
+# Blocks attributed to the measurement itself, such as the integer it returns
+_BLOCKS_OVERHEAD = retained_blocks(lambda: None)
+
+
+def measure(fn: Callable[[], object], min_time: float, repeats: int) -> Dict:
+    """Time fn with an auto-calibrated loop count and trace one call's allocations"""
+    loops = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9 / repeats or loops >= 1 << 24:
+            break
+        loops *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter_ns() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    blocks = retained_blocks(fn) - _BLOCKS_OVERHEAD
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ns_per_op": min(samples),
+        "median_ns_per_op": statistics.median(samples),
+        "alloc_bytes_per_op": peak - baseline,
+        "retained_blocks_per_op": blocks,
+        "loops": loops,
+        "repeats": repeats
+    }
+
+
+def build_benchmarks() -> Dict[str, Callable[[], object]]:
+    service = AIService()
+    benchmarks: Dict[str, Callable[[], object]] = {}
+    prompt = PROMPTS[0]
+
+    for component_type, template in COMPONENTS.items():
+        content = service._get_default_content(component_type, prompt)
+        benchmarks[f"fill_template[{component_type}]"] = (
+            lambda template=template["modern"], content=content, component_type=component_type:
+            service._fill_template(template, content, component_type)
+        )
+
+    components = service.generate_instant(prompt)["components"]
+    meta_info = service._heuristic_meta(prompt)
+    for scheme in COLOR_SCHEMES:
+        benchmarks[f"assemble_html[{scheme}]"] = (
+            lambda scheme=scheme: service._assemble_html(components, meta_info, "modern", scheme)
+        )
+        benchmarks[f"assemble_css[{scheme}]"] = (
+            lambda scheme=scheme: service._assemble_css(components, scheme)
+        )
+
+    def parse(text: str) -> Optional[dict]:
+        json_str = service._extract_json(text)
+        if json_str is None:
+            return None
+        try:
+            return json.loads(json_str)
+        except json.JSONDecodeError:
+            return None
+
+    for kind, text in MODEL_RESPONSES.items():
+        benchmarks[f"extract_json[{kind}]"] = lambda text=text: parse(text)
+
+    # Heuristics cycle through the prompt corpus, one prompt per operation
+    corpus = itertools.cycle(PROMPTS)
+    classifier = get_classifier()
+    benchmarks["heuristic_analyze"] = lambda: service._heuristic_analyze(next(corpus))
+    benchmarks["infer_website_type"] = lambda: service._infer_website_type(next(corpus))
+    benchmarks["extract_role"] = lambda: service._extract_role(next(corpus))
+    benchmarks["classify[uncached]"] = lambda: classifier.classify(next(corpus))
+    # Keep the memoized benchmarks measuring hits rather than first calls
+    for text in PROMPTS:
+        classify(text)
+
+    return benchmarks
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to spend timing each benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'benchmark':<32}{'ns/op':>12}{'median':>12}{'alloc B/op':>12}{'blocks/op':>11}")
+    for name, fn in build_benchmarks().items():
+        if args.filter not in name:
+            continue
+        stats = measure(fn, args.min_time, args.repeats)
+        results[name] = stats
+        print(f"{name:<32}{stats['ns_per_op']:>12.0f}{stats['median_ns_per_op']:>12.0f}"
+              f"{stats['alloc_bytes_per_op']:>12}{stats['retained_blocks_per_op']:>11}")
+
+    report = {
+        "benchmarks": results,
+        "python": sys.version.split()[0],
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
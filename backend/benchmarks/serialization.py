@@ -0,0 +1,135 @@
+"""
+Response serialization cost for large generation and project payloads
+
+Compares, per payload size, what a route spends turning its result into
+response bytes:
+
+- generate: FastAPI's response_model path (validate the dict against
+  WebsiteResponse, jsonable_encoder, JSONResponse) against the ORJSONResponse
+  the route now returns directly
+- project: jsonable_encoder plus JSONResponse for a stored project document
+  against ORJSONResponse
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --sizes 50 200 --output serialization.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.schemas import WebsiteResponse
+from app.routes.generate import website_content
+from app.services.ai_service import AIService
+
+from .load_test import git_commit
+
+
+def generation_payload(size_kb: int) -> Dict:
+    """An instant generation result padded to about size_kb of HTML and CSS"""
+    result = AIService().generate_instant("Portfolio for a wedding photographer with a gallery and pricing")
+    base = len(result["html"]) + len(result["css"]) + sum(len(c["html"]) for c in result["components"])
+    repeats = max(1, round(size_kb * 1024 / base))
+    result["html"] = result["html"] * repeats
+    result["css"] = result["css"] * repeats
+    for component in result["components"]:
+        component["html"] = component["html"] * repeats
+    return result
+
+
+def project_payload(size_kb: int) -> Dict:
+    generation = generation_payload(size_kb)
+    now = datetime.utcnow()
+    return {
+        "id": "6650f1c2a7b3e4d5f6a7b8c9",
+        "name": generation["title"],
+        **{key: generation[key] for key in (
+            "prompt", "html", "css", "js", "components", "meta_description", "title", "style", "color_scheme"
+        )},
+        "created_at": now,
+        "updated_at": now
+    }
+
+
+def time_per_op(fn: Callable[[], object], min_time: float, repeats: int) -> float:
+    """Median seconds per call over repeats timing rounds"""
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time / 10:
+            break
+        number *= 2
+    rounds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    return statistics.median(rounds)
+
+
+def build_cases(size_kb: int) -> Dict[str, Callable[[], object]]:
+    field = create_response_field(name="response", type_=WebsiteResponse)
+    loop = asyncio.new_event_loop()
+    generation = generation_payload(size_kb)
+    project = project_payload(size_kb)
+
+    def generate_before() -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=generation))
+        return JSONResponse(content).body
+
+    return {
+        "generate/response_model": generate_before,
+        "generate/orjson": lambda: ORJSONResponse(website_content(generation)).body,
+        "project/jsonable_encoder": lambda: JSONResponse(jsonable_encoder(project)).body,
+        "project/orjson": lambda: ORJSONResponse(project).body
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200], help="Payload sizes in KB")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to spend timing each case")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict] = {}
+    print(f"{'case':<28}{'size KB':>9}{'us/op':>10}{'MB/s':>9}")
+    for size_kb in args.sizes:
+        for name, fn in build_cases(size_kb).items():
+            body_bytes = len(fn())
+            seconds = time_per_op(fn, args.min_time, args.repeats)
+            results[f"{name}@{size_kb}KB"] = {
+                "payload_bytes": body_bytes,
+                "us_per_op": round(seconds * 1e6, 1),
+                "mb_per_s": round(body_bytes / seconds / 1e6, 1)
+            }
+            print(f"{name:<28}{body_bytes / 1024:>9.0f}{seconds * 1e6:>10.1f}{body_bytes / seconds / 1e6:>9.1f}")
+
+    report = {
+        "benchmarks": results,
+        "python": sys.version.split()[0],
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Model response cache hit ratio across worker processes
+
+Starts several processes that each generate the same prompts with the fake
+provider and a response cache, like uvicorn workers serving overlapping
+traffic, and reports model calls and hit ratio per shared state backend.
+With the per-process memory backend every worker pays for its own misses;
+with the SQLite backend the hit ratio holds as workers are added:
+
+    python -m benchmarks.shared_cache --workers 1 2 4 --prompts 20
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .corpus import PROMPTS
+from .load_test import git_commit
+
+
+def _worker(backend: str, path: str, prompts: List[str], latency: str, results) -> None:
+    os.environ.update(
+        MODEL_PROVIDER="fake",
+        FAKE_MODEL_LATENCY=latency,
+        MODEL_CACHE_TTL_S="3600",
+        SHARED_STATE=backend,
+        SHARED_STATE_PATH=path,
+        LOG_LEVEL="ERROR"
+    )
+    from app.services.ai_service import AIService
+
+    async def run() -> None:
+        ai_service = AIService()
+        for prompt in prompts:
+            await ai_service.generate_website(prompt)
+
+    asyncio.run(run())
+    results.put(_stats())
+
+
+def _stats() -> Dict:
+    from app.services.metrics import REGISTRY
+
+    text = REGISTRY.render()
+    stats = {"hits": 0, "misses": 0}
+    for line in text.splitlines():
+        for name in stats:
+            if line.startswith(f'cache_{name}_total{{cache="model_response"}}'):
+                stats[name] = int(float(line.rsplit(" ", 1)[1]))
+    return stats
+
+
+def run_backend(backend: str, workers: int, prompts: List[str], latency: str) -> Dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "state.db")
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_worker, args=(backend, path, prompts, latency, results))
+            for _ in range(workers)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        stats = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+    hits = sum(s["hits"] for s in stats)
+    misses = sum(s["misses"] for s in stats)
+    return {
+        "backend": backend,
+        "workers": workers,
+        "model_calls": misses,
+        "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        "elapsed_s": round(elapsed, 2)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--prompts", type=int, default=20, help="Prompts generated by every worker")
+    parser.add_argument("--model-latency", default="fixed:20", help="Fake provider latency distribution")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.prompts)]
+    results = []
+    print(f"{'backend':<10}{'workers':>8}{'model calls':>13}{'hit ratio':>11}{'seconds':>9}")
+    for backend in ("memory", "sqlite"):
+        for workers in args.workers:
+            result = run_backend(backend, workers, prompts, args.model_latency)
+            results.append(result)
+            print(f"{backend:<10}{workers:>8}{result['model_calls']:>13}{result['hit_ratio']:>11.3f}{result['elapsed_s']:>9.2f}")
+    report = {"results": results, "commit": git_commit(), "model_latency": args.model_latency}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Cold-start benchmark for the API
+
+Measures, in fresh interpreter processes, how long it takes from launching
+Python until the first GET /health is answered (lifespan startup included),
+and where import time goes according to python -X importtime, summed per
+top-level package:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeats 20 --output startup.json
+
+Save --output files from different commits to track cold start over time.
+The app starts with the configuration it ships with, taken from the
+environment: set VERCEL=1 (or DATABASE_MODE=serverless) to measure a
+serverless start, where no generation workers run by default.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.models.database import database_mode
+
+from .load_test import git_commit
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Runs in the child: start the app and serve one /health request over raw ASGI,
+# so no HTTP client library adds to the measured imports
+_FIRST_HEALTH = """
+import asyncio
+from app.main import app
+
+async def main():
+    startup = asyncio.Queue()
+    startup.put_nowait({"type": "lifespan.startup"})
+    started = asyncio.Event()
+
+    async def lifespan_send(message):
+        if message["type"] == "lifespan.startup.complete":
+            started.set()
+
+    lifespan = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, startup.get, lifespan_send))
+    await started.wait()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/health", "raw_path": b"/health", "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"startup")], "client": ("127.0.0.1", 1),
+        "server": ("startup", 80)
+    }
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    print(status[0], flush=True)
+    lifespan.cancel()
+
+asyncio.run(main())
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("LOG_LEVEL", "ERROR")
+    return env
+
+
+def time_first_health() -> float:
+    """Seconds from spawning the interpreter to the first /health response"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", _FIRST_HEALTH],
+        cwd=BACKEND_DIR, env=_child_env(), stdout=subprocess.PIPE, text=True
+    )
+    status = process.stdout.readline().strip()
+    elapsed = time.perf_counter() - start
+    # Generation workers may still be waiting on MongoDB; their shutdown is not measured
+    process.kill()
+    process.wait()
+    if status != "200":
+        raise RuntimeError(f"/health answered {status or 'nothing'}")
+    return elapsed
+
+
+def import_profile() -> Dict[str, float]:
+    """Self import time in milliseconds per top-level package for one cold import of app.main"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=_child_env(), capture_output=True, text=True, check=True
+    )
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        name = name.strip()
+        package = ".".join(name.split(".")[:2]) if name.startswith("app.") else name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1000
+    return packages
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=10, help="Fresh processes to time")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list in the import report")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    first_health = sorted(time_first_health() * 1000 for _ in range(args.repeats))
+    profiles = [import_profile() for _ in range(args.repeats)]
+    # Per-package minimum over runs filters out noise from other processes
+    imports = {
+        package: min(profile.get(package, 0.0) for profile in profiles)
+        for package in set().union(*profiles)
+    }
+    imports = dict(sorted(imports.items(), key=lambda item: item[1], reverse=True))
+
+    print(f"time to first /health: median {statistics.median(first_health):.0f} ms, "
+          f"min {first_health[0]:.0f} ms over {args.repeats} runs")
+    print(f"import app.main: {sum(imports.values()):.0f} ms")
+    print(f"{'package':<32}{'ms':>8}")
+    for package, ms in list(imports.items())[:args.top]:
+        print(f"{package:<32}{ms:>8.1f}")
+
+    report = {
+        "first_health_ms": {
+            "median": round(statistics.median(first_health), 1),
+            "min": round(first_health[0], 1),
+            "max": round(first_health[-1], 1)
+        },
+        "import_ms": round(sum(imports.values()), 1),
+        "database_mode": database_mode(),
+        "generation_workers": os.getenv("GENERATION_WORKERS") or None,
+        "imports_by_package_ms": {package: round(ms, 2) for package, ms in imports.items()},
+        "python": sys.version.split()[0],
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import sys
 sys.path.insert(0, '.')
+from app.env import load_environment
 from app.models.database import Database
 
+load_environment()
+
 try:
     db = Database.get_database()
     print('✓ MongoDB Atlas connected successfully')
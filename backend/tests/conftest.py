@@ -0,0 +1,8 @@
+import os
+
+# Tests never call a real model or write to the shared state file
+os.environ.setdefault("MODEL_PROVIDER", "fake")
+os.environ.setdefault("FAKE_MODEL_LATENCY", "fixed:0")
+os.environ.setdefault("SHARED_STATE", "memory")
+os.environ.setdefault("GENERATION_WORKERS", "0")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+def test_rate_limit_rejects_after_burst_with_429():
+    async def scenario():
+        controller = AdmissionController(rate_per_client=0.5, burst_per_client=2)
+        for _ in range(2):
+            async with controller.slot("client"):
+                pass
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.slot("client"):
+                pass
+        # Other clients have their own bucket
+        async with controller.slot("other"):
+            pass
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 429
+    assert rejected.retry_after >= 1
+
+
+def test_full_queue_rejects_with_429():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0)
+        async with controller.slot():
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with controller.slot():
+                    pass
+        return rejected.value
+
+    assert asyncio.run(scenario()).status_code == 429
+
+
+def test_queue_timeout_rejects_with_503():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.01)
+        async with controller.slot():
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with controller.slot():
+                    pass
+        return rejected.value, controller
+
+    rejected, controller = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert controller._waiting == 0
+
+
+def test_queued_request_runs_when_slot_frees():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=1)
+        order = []
+
+        async def run(name: str) -> None:
+            async with controller.slot():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(run("first"), run("second"))
+        return order
+
+    assert asyncio.run(scenario()) == ["first", "second"]
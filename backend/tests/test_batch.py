@@ -0,0 +1,89 @@
+import asyncio
+
+from app.services.batch import run_deduplicated
+
+
+def _collect(items, worker, concurrency=4):
+    async def scenario():
+        return [outcome async for outcome in run_deduplicated(items, lambda item: item, worker, concurrency)]
+
+    return asyncio.run(scenario())
+
+
+def test_identical_items_run_once_and_report_every_index():
+    calls = []
+
+    async def worker(item):
+        calls.append(item)
+        return item.upper()
+
+    outcomes = _collect(["a", "b", "a", "c", "b", "a"], worker)
+
+    assert sorted(calls) == ["a", "b", "c"]
+    by_result = {result: indices for indices, result, error in outcomes}
+    assert by_result == {"A": [0, 2, 5], "B": [1, 4], "C": [3]}
+    assert all(error is None for _, _, error in outcomes)
+
+
+def test_results_are_yielded_in_completion_order():
+    delays = {"slow": 0.05, "medium": 0.02, "fast": 0}
+
+    async def worker(item):
+        await asyncio.sleep(delays[item])
+        return item
+
+    outcomes = _collect(["slow", "medium", "fast"], worker)
+
+    assert [result for _, result, _ in outcomes] == ["fast", "medium", "slow"]
+
+
+def test_errors_are_reported_per_item():
+    async def worker(item):
+        if item == "bad":
+            raise ValueError(item)
+        return item
+
+    outcomes = {tuple(indices): (result, error) for indices, result, error in _collect(["ok", "bad", "bad"], worker)}
+
+    assert outcomes[(0,)] == ("ok", None)
+    result, error = outcomes[(1, 2)]
+    assert result is None and isinstance(error, ValueError)
+
+
+def test_concurrency_is_bounded():
+    running = 0
+    peak = 0
+
+    async def worker(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item
+
+    outcomes = _collect(list(range(10)), worker, concurrency=3)
+
+    assert peak == 3
+    assert sorted(indices[0] for indices, _, _ in outcomes) == list(range(10))
+
+
+def test_stopping_early_cancels_remaining_work():
+    cancelled = []
+
+    async def worker(item):
+        try:
+            await asyncio.sleep(0 if item == "first" else 1)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    async def scenario():
+        stream = run_deduplicated(["first", "second", "third"], lambda item: item, worker, 3)
+        async for indices, result, error in stream:
+            await stream.aclose()
+            return result
+
+    assert asyncio.run(scenario()) == "first"
+    assert sorted(cancelled) == ["second", "third"]
@@ -0,0 +1,25 @@
+import asyncio
+
+from app.services.cassette import CassetteProvider, CassetteStore
+from app.services.providers import ModelConfig, ModelProvider, ModelResponse
+
+
+class EchoSettingsProvider(ModelProvider):
+    name = "echo"
+
+    async def generate(self, prompt, config=None):
+        return ModelResponse(text=f"{prompt}@{config.temperature if config else None}")
+
+
+def test_replay_keeps_recordings_at_different_temperatures_apart(tmp_path):
+    store = CassetteStore(tmp_path)
+    configs = [None, ModelConfig(temperature=0.7), ModelConfig(temperature=0.9)]
+
+    async def scenario():
+        recorder = CassetteProvider(store, "record", inner=EchoSettingsProvider())
+        for config in configs:
+            await recorder.generate("hero", config)
+        player = CassetteProvider(store, "replay", latency_scale=0)
+        return [(await player.generate("hero", config)).text for config in configs]
+
+    assert asyncio.run(scenario()) == ["hero@None", "hero@0.7", "hero@0.9"]
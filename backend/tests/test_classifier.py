@@ -0,0 +1,89 @@
+import random
+
+from app.services.classifier import KeywordClassifier, get_classifier
+
+from benchmarks.corpus import PROMPTS
+
+
+# The inference chains the classifier replaced, kept as the reference
+
+def reference_website_type(prompt: str) -> str:
+    pl = prompt.lower()
+    if any(k in pl for k in ["portfolio", "photographer", "designer", "developer portfolio"]):
+        return "portfolio"
+    if any(k in pl for k in ["blog", "writer", "journal", "articles"]):
+        return "blog"
+    if any(k in pl for k in ["shop", "store", "ecommerce", "products"]):
+        return "ecommerce"
+    if any(k in pl for k in ["landing", "launch", "signup"]):
+        return "landing"
+    return "business"
+
+
+def reference_role(prompt: str) -> str:
+    pl = prompt.lower()
+    candidates = [
+        ("mobile developer", ["mobile developer", "android developer", "ios developer"]),
+        ("software developer", ["software developer", "software engineer", "full stack developer", "backend developer", "frontend developer"]),
+        ("photographer", ["photographer", "photography"]),
+        ("travel writer", ["travel writer", "travel blogger"]),
+        ("restaurant", ["restaurant", "cafe", "bistro"]),
+        ("saas startup", ["saas", "startup"]),
+    ]
+    for label, keys in candidates:
+        if any(k in pl for k in keys):
+            return label
+    if " for " in pl:
+        return pl.split(" for ", 1)[1].strip()
+    return "professional"
+
+
+def reference_service(prompt: str) -> str:
+    if "mobile" in prompt.lower():
+        return "mobile development"
+    elif "software" in prompt.lower():
+        return "software solutions"
+    elif "portfolio" in prompt.lower():
+        return "portfolio services"
+    elif "blog" in prompt.lower():
+        return "content creation"
+    return "professional services"
+
+
+_FRAGMENTS = [
+    "portfolio", "photographer", "photography", "designer", "developer", "developer portfolio", "blog",
+    "blogger", "writer", "travel", "travel writer", "journal", "articles", "shop", "store", "ecommerce",
+    "products", "landing", "launch", "signup", "mobile", "android", "ios", "software", "engineer",
+    "full stack", "backend", "frontend", "restaurant", "cafe", "bistro", "saas", "startup", "for",
+    "a", "the", "site", "website", "Portfolio", "BLOG", "Travel Writer", "with", "and"
+]
+
+
+def _random_prompts(count: int):
+    rng = random.Random(30)
+    for _ in range(count):
+        words = rng.choices(_FRAGMENTS, k=rng.randint(1, 8))
+        yield rng.choice([" ", "", "-"]).join(words)
+
+
+def test_matches_reference_inference():
+    classifier = get_classifier()
+    for prompt in [*PROMPTS, *_random_prompts(20000)]:
+        traits = classifier.classify(prompt)
+        assert traits.website_type == reference_website_type(prompt), prompt
+        assert traits.role == reference_role(prompt), prompt
+        assert traits.service == reference_service(prompt), prompt
+
+
+def test_custom_taxonomy_priority_and_defaults():
+    classifier = KeywordClassifier({
+        "website_types": {"default": "business", "labels": [
+            {"label": "clinic", "keywords": ["dental", "clinic"]},
+            {"label": "shop", "keywords": ["dental supplies"]}
+        ]},
+        "services": {"labels": []}
+    })
+    assert classifier.classify("Dental supplies store").website_type == "clinic"
+    assert classifier.classify("Accounting firm").website_type == "business"
+    assert classifier.classify("Accounting firm").service == "professional services"
+    assert classifier.classify("Site for a yoga teacher").role == "a yoga teacher"
@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+import orjson
+
+from app.main import app
+
+
+def _post(path, body):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=body)
+
+    return asyncio.run(scenario())
+
+
+def test_unknown_color_schemes_are_rejected_with_400():
+    for body in (
+        {"prompt": "a bakery", "color_scheme": "neon"},
+        {"prompt": "a bakery", "color_scheme": "neon", "mode": "instant"},
+        {"prompt": "a bakery", "variants": 2, "variant_color_schemes": ["neon"]}
+    ):
+        response = _post("/api/generate", body)
+        assert response.status_code == 400, body
+        assert response.json()["detail"] == "Unknown color scheme: neon"
+
+
+def test_unknown_color_scheme_fails_only_its_batch_item():
+    response = _post("/api/generate/batch", {"requests": [
+        {"prompt": "a bakery", "mode": "instant"},
+        {"prompt": "a bakery", "mode": "instant", "color_scheme": "neon"}
+    ]})
+
+    lines = sorted((orjson.loads(line) for line in response.content.splitlines()), key=lambda line: line["index"])
+    assert [line["status"] for line in lines] == ["ok", "error"]
+    assert lines[1]["status_code"] == 400
+
+
+def test_page_weight_report_is_only_included_on_request():
+    for mode in ("instant", "ai"):
+        default = _post("/api/generate", {"prompt": "a bakery", "mode": mode, "variants": 2}).json()
+        assert default["page_weight"] is None
+        assert all(variant["page_weight"] is None for variant in default["variants"])
+
+        requested = _post("/api/generate", {"prompt": "a bakery", "mode": mode, "variants": 2, "page_weight": True}).json()
+        assert requested["page_weight"]["bytes"]["total"]["gzip"] > 0
+        assert all(variant["page_weight"]["within_budget"] in (True, False) for variant in requested["variants"])
@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+from app import worker
+from app.main import app
+from app.models.database import get_database
+from app.services.ai_service import AIService
+from app.services.jobs import TERMINAL_STATUSES, JobStore, JobWorkerPool, pool_from_env
+
+
+def _store(lease_s: float) -> JobStore:
+    return JobStore(AsyncMongoMockClient()["test"], lease_s=lease_s)
+
+
+def test_claim_takes_oldest_queued_job_once():
+    async def scenario():
+        store = _store(lease_s=60)
+        first = await store.create({"prompt": "first"})
+        await store.create({"prompt": "second"})
+        claimed = await store.claim("a")
+        other = await store.claim("b")
+        nothing = await store.claim("c")
+        return first, claimed, other, nothing
+
+    first, claimed, other, nothing = asyncio.run(scenario())
+    assert str(claimed["_id"]) == first
+    assert claimed["status"] == "running" and claimed["worker_id"] == "a"
+    assert other["request"]["prompt"] == "second"
+    assert nothing is None
+
+
+def test_expired_lease_is_reclaimed_and_stale_worker_cannot_record():
+    async def scenario():
+        store = _store(lease_s=0.05)
+        job_id = await store.create({"prompt": "x"})
+        stale = await store.claim("a")
+        assert await store.claim("b") is None
+        await asyncio.sleep(0.1)
+        fresh = await store.claim("b")
+        stale_recorded = await store.complete(stale["_id"], "a", {"from": "a"})
+        fresh_recorded = await store.complete(fresh["_id"], "b", {"from": "b"})
+        return fresh, stale_recorded, fresh_recorded, await store.get(job_id)
+
+    fresh, stale_recorded, fresh_recorded, job = asyncio.run(scenario())
+    assert fresh["worker_id"] == "b" and fresh["attempts"] == 2
+    assert not stale_recorded and fresh_recorded
+    assert job["status"] == "completed" and job["result"] == {"from": "b"}
+
+
+def test_partial_components_renew_the_lease_only_for_the_owner():
+    async def scenario():
+        store = _store(lease_s=60)
+        job_id = await store.create({"prompt": "x"})
+        job = await store.claim("a")
+        await store.add_partial(job["_id"], "a", {"type": "hero"})
+        await store.add_partial(job["_id"], "b", {"type": "footer"})
+        return await store.get(job_id), job
+
+    job, claimed = asyncio.run(scenario())
+    assert job["partial_components"] == [{"type": "hero"}]
+    assert job["lease_until"] >= claimed["lease_until"]
+
+
+def test_serverless_mode_starts_no_workers_unless_configured(monkeypatch):
+    monkeypatch.delenv("GENERATION_WORKERS", raising=False)
+    monkeypatch.delenv("DATABASE_MODE", raising=False)
+    monkeypatch.setenv("VERCEL", "1")
+    db = AsyncMongoMockClient()["test"]
+    assert pool_from_env(lambda: db, AIService) is None
+
+    monkeypatch.setenv("GENERATION_WORKERS", "1")
+    assert pool_from_env(lambda: db, AIService).workers == 1
+
+    monkeypatch.delenv("GENERATION_WORKERS")
+    monkeypatch.delenv("VERCEL")
+    assert pool_from_env(lambda: db, AIService).workers == 2
+
+
+class SlowService:
+    """A generation that outlasts several leases without writing a component"""
+
+    async def generate_website(self, **request):
+        await asyncio.sleep(0.4)
+        return {"prompt": request["prompt"]}
+
+
+def test_running_job_keeps_its_lease_through_a_slow_generation():
+    async def scenario():
+        store = _store(lease_s=0.1)
+        job_id = await store.create({"prompt": "x"})
+        pool = JobWorkerPool(store, SlowService)
+        running = asyncio.create_task(pool._process(await store.claim("a")))
+        stolen = []
+        while not running.done():
+            await asyncio.sleep(0.02)
+            stolen.append(await store.claim("b"))
+        return stolen, await store.get(job_id)
+
+    stolen, job = asyncio.run(scenario())
+    assert not any(stolen)
+    assert job["status"] == "completed" and job["attempts"] == 1 and job["result"] == {"prompt": "x"}
+
+
+def _queue(db, body):
+    async def scenario():
+        app.dependency_overrides[get_database] = lambda: db
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/api/generate/jobs", json=body)
+        finally:
+            app.dependency_overrides.pop(get_database)
+
+    return asyncio.run(scenario())
+
+
+def test_jobs_are_refused_when_no_worker_would_run_them(monkeypatch):
+    monkeypatch.delenv("GENERATION_EXTERNAL_WORKERS", raising=False)
+    db = AsyncMongoMockClient()["test"]
+
+    response = _queue(db, {"prompt": "a bakery"})
+
+    assert response.status_code == 503
+    assert "python -m app.worker" in response.json()["detail"]
+    assert asyncio.run(db.generation_jobs.count_documents({})) == 0
+
+
+def test_external_workers_run_queued_jobs(monkeypatch):
+    monkeypatch.setenv("GENERATION_EXTERNAL_WORKERS", "1")
+    monkeypatch.setenv("GENERATION_JOB_POLL_S", "0.01")
+    db = AsyncMongoMockClient()["test"]
+
+    queued = _queue(db, {"prompt": "a bakery", "mode": "instant"})
+    assert queued.status_code == 202
+
+    async def scenario():
+        store = JobStore(db)
+        stop = asyncio.Event()
+        serving = asyncio.create_task(worker.serve(db, 1, stop))
+        while (await store.get(queued.json()["id"]))["status"] not in TERMINAL_STATUSES:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await serving
+        return await store.get(queued.json()["id"])
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "completed" and job["result"]["prompt"] == "a bakery"
@@ -0,0 +1,39 @@
+from app.services.ai_service import AIService
+from app.services.page_weight import analyze_page
+
+PAGE = '<link rel="stylesheet" href="theme.css"><div class="card"><p id="lead">Hi</p></div>'
+CSS = """@import "reset.css";
+.card, #lead > p, .hidden:hover { background: url(bg.png); }
+@media (max-width: 600px) { .card p { margin: 0; } .missing { top: 0; } }
+@keyframes fade { from { opacity: 0; } to { opacity: 1; } }
+"""
+JS = "el.classList.toggle('hidden')"
+
+
+def test_report_counts_rules_unused_selectors_and_requests():
+    report = analyze_page(PAGE, CSS, JS, budgets={"unused_selectors": 0})
+
+    assert report["css"]["rules"] == 3
+    assert report["css"]["selectors"] == 5
+    assert report["css"]["unused_selectors"] == [".missing"]
+    assert report["external_requests"] == 3
+    assert report["dom"] == {"nodes": 3, "max_depth": 2}
+    assert report["over_budget"] == [{"metric": "unused_selectors", "value": 1, "limit": 0}]
+
+
+def test_cached_stylesheet_is_checked_against_each_page():
+    analyze_page(PAGE, CSS, JS)
+    report = analyze_page('<div class="missing"><p>Hi</p></div>', CSS, "")
+
+    assert report["css"]["unused_selectors"] == [".card", "#lead > p", ".hidden:hover", ".card p"]
+    # The stylesheet's URLs still count for a page that links nothing itself
+    assert report["external_requests"] == 2
+
+
+def test_generation_only_reports_page_weight_on_request():
+    service = AIService()
+    prompt = "A bakery with a menu and a contact form"
+
+    assert service.generate_instant(prompt)["page_weight"] is None
+    report = service.generate_instant(prompt, page_weight=True)["page_weight"]
+    assert report["bytes"]["total"]["gzip"] > 0
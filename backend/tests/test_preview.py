@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+from app.main import app
+from app.models.database import get_database
+
+
+def test_preview_responses_are_sandboxed():
+    db = AsyncMongoMockClient()["test"]
+    project_id = asyncio.run(db.projects.insert_one({
+        "html": '<link rel="stylesheet" href="styles.css"><script src="script.js"></script>',
+        "css": "body {}",
+        "js": ""
+    })).inserted_id
+
+    async def scenario():
+        app.dependency_overrides[get_database] = lambda: db
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                page = await client.get(f"/preview/{project_id}/index.html")
+                cached = await client.get(f"/preview/{project_id}/index.html", headers={"If-None-Match": page.headers["etag"]})
+                script = await client.get(f"/preview/{project_id}/script.js")
+                return page, cached, script
+        finally:
+            app.dependency_overrides.pop(get_database)
+
+    for response in asyncio.run(scenario()):
+        assert response.status_code in (200, 304)
+        assert response.headers["content-security-policy"] == "sandbox allow-scripts"
+        assert response.headers["x-content-type-options"] == "nosniff"
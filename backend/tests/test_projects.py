@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+from app.main import app
+from app.models.database import get_database
+from app.routes import projects
+
+
+class EditingService:
+    """Saves a concurrent edit to the project while a component is regenerated"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def regenerate_component(self, project, index, prompt=None):
+        await self.db.projects.update_one({"_id": project["_id"]}, {"$set": {"html": "<p>edited</p>"}})
+        return {"component": {"type": "hero", "html": "<section>new</section>"}, "html": "<p>new</p>", "usage": {}}
+
+
+def _post(db, path):
+    async def scenario():
+        app.dependency_overrides[get_database] = lambda: db
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(path, json={})
+        finally:
+            app.dependency_overrides.pop(get_database)
+
+    return asyncio.run(scenario())
+
+
+def test_regenerate_component_does_not_overwrite_a_concurrent_edit(monkeypatch):
+    db = AsyncMongoMockClient()["test"]
+    project_id = asyncio.run(db.projects.insert_one({
+        "prompt": "a bakery",
+        "components": [{"type": "hero", "html": "<section>old</section>"}],
+        "html": "<p>old</p>"
+    })).inserted_id
+    monkeypatch.setattr(projects, "get_ai_service", lambda: EditingService(db))
+
+    response = _post(db, f"/api/projects/{project_id}/components/hero/regenerate")
+
+    assert response.status_code == 409
+    saved = asyncio.run(db.projects.find_one({"_id": project_id}))
+    assert saved["html"] == "<p>edited</p>"
+    assert saved["components"][0]["html"] == "<section>old</section>"
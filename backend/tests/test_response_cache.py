@@ -0,0 +1,98 @@
+import asyncio
+
+from app.services.ai_service import AIService
+from app.services.providers import ModelConfig, ModelProvider, ModelResponse
+from app.services.response_cache import CachingProvider
+from app.services.shared_state import MemoryState
+
+
+class CountingProvider(ModelProvider):
+    """Answers after a short delay, optionally failing, and counts its calls"""
+    name = "counting"
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    async def generate(self, prompt, config=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return ModelResponse(text=f"{prompt}#{self.calls}", input_tokens=10, output_tokens=20)
+
+
+def test_concurrent_identical_calls_reach_the_model_once():
+    inner = CountingProvider()
+
+    async def scenario():
+        cache = CachingProvider(inner, MemoryState(), ttl_s=60)
+        return await asyncio.gather(*(cache.generate("hero") for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+    assert inner.calls == 1
+    assert {response.text for response in responses} == {"hero#1"}
+    # Only the caller that made the call reports its tokens
+    assert sorted(response.output_tokens for response in responses) == [0, 0, 0, 0, 20]
+
+
+def test_workers_sharing_state_call_the_model_once():
+    inner = CountingProvider()
+
+    async def scenario():
+        state = MemoryState()
+        workers = [CachingProvider(inner, state, ttl_s=60, poll_interval=0.001) for _ in range(3)]
+        return await asyncio.gather(*(worker.generate("hero") for worker in workers))
+
+    responses = asyncio.run(scenario())
+    assert inner.calls == 1
+    assert {response.text for response in responses} == {"hero#1"}
+
+
+def test_cached_response_reports_zero_tokens_and_settings_are_part_of_the_key():
+    inner = CountingProvider()
+
+    async def scenario():
+        cache = CachingProvider(inner, MemoryState(), ttl_s=60)
+        first = await cache.generate("hero")
+        again = await cache.generate("hero")
+        warmer = await cache.generate("hero", ModelConfig(temperature=0.9))
+        return first, again, warmer, cache
+
+    first, again, warmer, cache = asyncio.run(scenario())
+    assert again.text == first.text and (again.input_tokens, again.output_tokens) == (0, 0)
+    assert warmer.text == "hero#2"
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_errors_reach_every_waiting_caller_and_are_not_cached():
+    inner = CountingProvider(fail=True)
+
+    async def scenario():
+        cache = CachingProvider(inner, MemoryState(), ttl_s=60)
+        results = await asyncio.gather(*(cache.generate("hero") for _ in range(3)), return_exceptions=True)
+        inner.fail = False
+        return results, await cache.generate("hero")
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried.text == "hero#2"
+
+
+def test_responses_that_are_not_cacheable_are_not_stored():
+    inner = CountingProvider()
+
+    async def scenario():
+        cache = CachingProvider(inner, MemoryState(), ttl_s=60, cacheable=lambda text: not text.endswith("#1"))
+        return [(await cache.generate("hero")).text for _ in range(3)]
+
+    # The first answer is rejected, so the next call reaches the model and is cached
+    assert asyncio.run(scenario()) == ["hero#1", "hero#2", "hero#2"]
+    assert inner.calls == 2
+
+
+def test_ai_service_only_caches_responses_that_parse():
+    service = AIService()
+    assert service._parses('```json\n{"title": "Bakery"}\n```')
+    assert not service._parses("Sorry, I cannot help with that")
+    assert not service._parses('{"title": "Bakery",}')
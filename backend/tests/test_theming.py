@@ -0,0 +1,48 @@
+import pytest
+
+from app.services.ai_service import AIService
+from app.services.theming import ThemeError, check_color_schemes, retheme_all, retheme_css
+from app.templates.color_schemes import COLOR_SCHEMES
+
+
+def test_check_color_schemes_accepts_known_schemes():
+    check_color_schemes(COLOR_SCHEMES)
+    check_color_schemes([])
+
+
+def test_check_color_schemes_names_unknown_schemes():
+    with pytest.raises(ThemeError, match="neon, sepia"):
+        check_color_schemes([next(iter(COLOR_SCHEMES)), "neon", "sepia"])
+
+
+def _stylesheets():
+    """The stylesheet _assemble_css builds for one page in every scheme"""
+    service = AIService()
+    components = service.generate_instant("A bakery with a menu, gallery and contact form")["components"]
+    return {scheme: service._assemble_css(components, scheme) for scheme in COLOR_SCHEMES}
+
+
+def test_retheme_css_matches_assembling_in_the_target_scheme():
+    stylesheets = _stylesheets()
+    for source, css in stylesheets.items():
+        for target, expected in stylesheets.items():
+            assert retheme_css(css, target) == expected, (source, target)
+
+
+def test_retheme_round_trips_back_to_the_original():
+    stylesheets = _stylesheets()
+    original = stylesheets["default"]
+    for scheme in COLOR_SCHEMES:
+        assert retheme_css(retheme_css(original, scheme), "default") == original
+
+
+def test_retheme_all_matches_retheme_css():
+    css = _stylesheets()["default"]
+    assert retheme_all(css) == {scheme: retheme_css(css, scheme) for scheme in COLOR_SCHEMES}
+
+
+def test_retheme_rejects_unknown_schemes_and_stylesheets_without_variables():
+    with pytest.raises(ThemeError):
+        retheme_css(_stylesheets()["default"], "neon")
+    with pytest.raises(ThemeError):
+        retheme_css("body { color: red; }", "default")
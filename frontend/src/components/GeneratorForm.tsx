@@ -47,6 +47,8 @@ export default function GeneratorForm({ onGenerate, isGenerating, setIsGeneratin
         prompt: prompt.trim(),
         style,
         color_scheme: colorScheme,
+        // Shown under the preview
+        page_weight: true,
       });
 
       onGenerate(result);
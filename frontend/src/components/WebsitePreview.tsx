@@ -1,7 +1,7 @@
 'use client';
 
 import { useState, useEffect } from 'react';
-import { WebsiteResponse } from '@/lib/api';
+import { WebsiteResponse, previewUrl } from '@/lib/api';
 import { downloadWebsite } from '@/lib/utils';
 import { FiDownload, FiMaximize2, FiMonitor, FiTablet, FiSmartphone, FiSave } from 'react-icons/fi';
 import SaveProjectModal from './SaveProjectModal';
@@ -17,6 +17,13 @@ export default function WebsitePreview({ website }: WebsitePreviewProps) {
   const [previewHTML, setPreviewHTML] = useState('');
 
   useEffect(() => {
+    if (website.id) {
+      // Saved projects load from the preview URL instead of being inlined
+      setPreviewHTML('');
+      setIframeKey(prev => prev + 1);
+      return;
+    }
+
     // Create complete HTML for preview
     const completeHTML = `
 <!DOCTYPE html>
@@ -134,11 +141,12 @@ ${website.html.replace(/<head>[\s\S]*?<\/head>/i, '').replace(/<\/?(!DOCTYPE |ht
           <iframe
             key={iframeKey}
             id="preview-iframe"
-            srcDoc={previewHTML}
+            src={website.id ? previewUrl(website.id) : undefined}
+            srcDoc={website.id ? undefined : previewHTML}
             className="w-full border-0"
             style={{ height: '600px' }}
             title="Website Preview"
-            sandbox="allow-scripts allow-same-origin"
+            sandbox="allow-scripts"
           />
         </div>
       </div>
@@ -163,6 +171,17 @@ ${website.html.replace(/<head>[\s\S]*?<\/head>/i, '').replace(/<\/?(!DOCTYPE |ht
             <dt className="text-sm text-gray-600 w-32">Components:</dt>
             <dd className="text-sm text-gray-900">{website.components.length} sections</dd>
           </div>
+          {website.page_weight && (
+            <div className="flex">
+              <dt className="text-sm text-gray-600 w-32">Page weight:</dt>
+              <dd className={`text-sm ${website.page_weight.within_budget ? 'text-gray-900' : 'text-red-700'}`}>
+                {(website.page_weight.bytes.total.gzip / 1024).toFixed(1)} KB gzipped,{' '}
+                {website.page_weight.dom.nodes} elements, {website.page_weight.external_requests} requests
+                {!website.page_weight.within_budget &&
+                  ` (over budget: ${website.page_weight.over_budget.map(v => v.metric).join(', ')})`}
+              </dd>
+            </div>
+          )}
         </dl>
       </div>
 
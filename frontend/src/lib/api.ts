@@ -6,9 +6,20 @@ export interface GenerateWebsiteRequest {
   prompt: string;
   style?: string;
   color_scheme?: string;
+  page_weight?: boolean;
+}
+
+export interface PageWeightReport {
+  bytes: Record<'html' | 'css' | 'js' | 'total', { raw: number; gzip: number }>;
+  dom: { nodes: number; max_depth: number };
+  css: { rules: number; selectors: number; unused_selector_count: number; unused_selectors: string[] };
+  external_requests: number;
+  within_budget: boolean;
+  over_budget: { metric: string; value: number; limit: number }[];
 }
 
 export interface WebsiteResponse {
+  id?: string;
   html: string;
   css: string;
   js: string;
@@ -18,6 +29,7 @@ export interface WebsiteResponse {
   prompt: string;
   style: string;
   color_scheme: string;
+  page_weight?: PageWeightReport;
 }
 
 export interface Project {
@@ -85,4 +97,8 @@ export const deleteProject = async (id: string) => {
   return response.data;
 };
 
+// Saved projects are served as real pages whose stylesheet and script URLs
+// are content-hashed, so the browser caches them across previews
+export const previewUrl = (id: string) => `${API_URL}/preview/${id}/index.html`;
+
 export default api;